@@ -1,6 +1,20 @@
+import argparse
 import random
+import time
+from collections import deque
+from itertools import islice
 
 game_state = 'player'
+SIDES = ('player', 'computer')
+
+# every piece once, in the order main() deals them from, as ints 0 to 27
+PIECES = tuple((x, y + x) for x in range(7) for y in range(7 - x))
+FLIPPED = tuple((b, a) for a, b in PIECES)
+# the folded sum the computer compares against its number counts
+SCORES = tuple(a + b if a + b <= 7 else 12 - a - b for a, b in PIECES)
+# bit i of NUMBER_MASKS[k] is set if piece i has the number k
+NUMBER_MASKS = tuple(sum(1 << i for i, piece in enumerate(PIECES)
+                         if number in piece) for number in range(7))
 
 
 def show_header() -> str:
@@ -72,15 +86,25 @@ def find_starting_piece(computer_pieces, player_pieces) -> list:
     :return: The highest value among the computer and player pieces.
     """
     global game_state
+    biggest, game_state = pick_starting_piece(computer_pieces, player_pieces)
+    return biggest
+
+
+def pick_starting_piece(computer_pieces, player_pieces) -> tuple:
+    """
+    Removes the highest domino between computer and player from its hand.
+
+    :param computer_pieces: The computer's pieces.
+    :param player_pieces: The player's pieces.
+    :return: The starting piece and the side that moves next.
+    """
     if max(computer_pieces) > max(player_pieces):
         biggest = max(computer_pieces)
         computer_pieces.remove(biggest)
-        return biggest
-    else:
-        biggest = max(player_pieces)
-        player_pieces.remove(biggest)
-        game_state = 'computer'
-        return biggest
+        return biggest, 'player'
+    biggest = max(player_pieces)
+    player_pieces.remove(biggest)
+    return biggest, 'computer'
 
 
 def print_snake(domino_snake) -> str:
@@ -88,14 +112,16 @@ def print_snake(domino_snake) -> str:
     Prints the given domino snake. If snake is over length of 6, snake
     is condensed showing first 3 and last 3 split with ...
 
-    :param domino_snake: A list representing the domino snake.
+    :param domino_snake: A deque representing the domino snake.
     :return: A string representing the printed domino snake.
     """
     if len(domino_snake) < 7:
         snake = ''.join([str(x) for x in domino_snake])
         return f'{snake}'
-    front = ''.join([str(x) for x in domino_snake[0:3]])
-    back = ''.join(str(x) for x in domino_snake[-3:])
+    # deques can't be sliced, islice walks only the pieces shown
+    front = ''.join([str(x) for x in islice(domino_snake, 3)])
+    back = ''.join(str(x) for x in
+                   reversed(list(islice(reversed(domino_snake), 3))))
     return f'{front}' + '...' + f'{back}'
 
 
@@ -151,33 +177,62 @@ def process_computer_move(computer_pieces, number_count, domino_snake,
     are found, the  continues choosing until a valid piece is chosen.
     If no piece can be chosen, the computer draws from the stock.
     """
-    # copying lets us remove numbers for each loop to find second highest
-    numbers = number_count.copy()
+    process_move(computer_pieces,
+                 choose_computer_move(computer_pieces, number_count,
+                                      domino_snake),
+                 stock_pieces, domino_snake, number_count)
 
-    while True:
-        if len(numbers) == 0:
-            process_move(computer_pieces, 0, stock_pieces, domino_snake,
-                         number_count)
-            return
-        max_value = max(numbers)
-        for count, x in enumerate(computer_pieces):
-            total = sum(x)
-            #  total = frequency of occurrence
-            if total > 7:
-                total = 12 - total
-
-            if total == max_value:
-                if validate_correct_selection(count + 1, computer_pieces,
-                                              domino_snake, stock_pieces):
-                    process_move(computer_pieces, count + 1, stock_pieces,
-                                 domino_snake, number_count)
-                    return
-                elif validate_correct_selection(-count - 1, computer_pieces,
-                                                domino_snake, stock_pieces):
-                    process_move(computer_pieces, -count - 1, stock_pieces,
-                                 domino_snake, number_count)
-                    return
-        numbers.remove(max_value)
+
+def choose_computer_move(computer_pieces, number_count, domino_snake) \
+        -> int:
+    """
+    Picks the computer's move without making it.
+
+    :param computer_pieces: List of domino pieces held by the computer.
+    :param number_count: Count of each number in the computer's hand and on
+    the board.
+    :param domino_snake: List representing the domino snake on the board.
+    :return: The move, in the form process_move() takes.
+    """
+    moves = ranked_moves(computer_pieces, number_count, domino_snake[0][0],
+                         domino_snake[-1][1])
+    return moves[0] if moves else 0
+
+
+def ranked_moves(pieces, number_count, left, right, scores=None) -> list:
+    """
+    Lists the moves the computer considers, best first.
+
+    A piece's score is its sum folded around 6, matching how many times a
+    number can be in the hand and on the board. Only pieces whose score is
+    one of the counts in number_count are considered, highest score first
+    and in hand order for equal scores, each on the right end before the
+    left. Drawing from the stock isn't listed, the computer draws when the
+    list is empty.
+
+    :param pieces: The pieces in hand, as pairs of numbers.
+    :param number_count: Count of each number in the hand and on the board.
+    :param left: The number at the left end of the snake.
+    :param right: The number at the right end of the snake.
+    :param scores: The score of each piece in hand, in the same order, or
+    None to work them out from the pieces.
+    :return: The moves, in the form process_move() takes.
+    """
+    if scores is None:
+        #  total = frequency of occurrence
+        scores = [piece[0] + piece[1] if piece[0] + piece[1] <= 7
+                  else 12 - piece[0] - piece[1] for piece in pieces]
+    counts = set(number_count)
+    scored = []
+    for count, (piece, total) in enumerate(zip(pieces, scores), 1):
+        if total in counts:
+            if right in piece:
+                scored.append((total, count))
+            if left in piece:
+                scored.append((total, -count))
+    # sorting is stable, so equal scores keep hand order
+    scored.sort(key=lambda move: -move[0])
+    return [move for _, move in scored]
 
 
 def process_move(pieces, move, stock_pieces, domino_snake,
@@ -211,9 +266,9 @@ def process_move(pieces, move, stock_pieces, domino_snake,
         piece = pieces[abs(move) - 1]
         add_count(number_count, piece)
         if domino_snake[0][0] != piece[1]:
-            domino_snake.insert(0, rotate_domino(piece))
+            domino_snake.appendleft(rotate_domino(piece))
         else:
-            domino_snake.insert(0, piece)
+            domino_snake.appendleft(piece)
         pieces.remove(pieces[abs(move) - 1])
     else:
         piece = stock_pieces.pop()
@@ -258,6 +313,19 @@ def check_ends(domino_snake) -> bool:
     return False
 
 
+def blocked(left, right, played) -> bool:
+    """
+    What check_ends() finds, from the ends of the snake and how many times
+    each number was played, a double counting twice.
+
+    :param left: the number at the left end of the snake
+    :param right: the number at the right end of the snake
+    :param played: times each number was played, indexed by the number
+    :return: True if no piece can be added to the snake
+    """
+    return left == right and played[left] >= 8
+
+
 def validate_correct_selection(move, pieces, domino_snake, stock_pieces) \
         -> bool:
     """
@@ -285,20 +353,30 @@ def validate_correct_selection(move, pieces, domino_snake, stock_pieces) \
     :param stock_pieces: A list containing the remaining pieces in the stock.
     :return: A boolean value indicating whether the move is valid or not.
     """
-    global game_state
-    if move == 0 and len(stock_pieces) != 0:
+    if is_valid_move(move, pieces, domino_snake, stock_pieces):
         return True
-    elif move > 0:
-        if domino_snake[-1][1] in pieces[move - 1]:
-            return True
-    elif move < 0:
-        if domino_snake[0][0] in pieces[abs(move) - 1]:
-            return True
     if game_state == 'player':  # because we don't need to tell AI
         print('Illegal move. Please try again.')
     return False
 
 
+def is_valid_move(move, pieces, domino_snake, stock_pieces) -> bool:
+    """
+    The checks of validate_correct_selection() without the message.
+
+    :param move: An integer representing the move to be validated.
+    :param pieces: A list containing the pieces held by the player or ai.
+    :param domino_snake: A list representing the domino snake.
+    :param stock_pieces: A list containing the remaining pieces in the stock.
+    :return: A boolean value indicating whether the move is valid or not.
+    """
+    if move == 0:
+        return len(stock_pieces) != 0
+    elif move > 0:
+        return domino_snake[-1][1] in pieces[move - 1]
+    return domino_snake[0][0] in pieces[abs(move) - 1]
+
+
 def init_count(number_count, computer_pieces, domino_snake) -> None:
     """
     Initializes the count of numbers in the computers hand and the starting
@@ -327,7 +405,259 @@ def add_count(number_count, piece) -> None:
     number_count[piece[1]] += 1
 
 
-def main() -> None:
+def hand_mask(pieces) -> int:
+    """
+    :param pieces: pieces as ints indexing PIECES
+    :return: the pieces as a bitmask, bit i set for piece i
+    """
+    mask = 0
+    for piece in pieces:
+        mask |= 1 << piece
+    return mask
+
+
+def opponent(side) -> str:
+    """
+    :param side: 'player' or 'computer'
+    :return: the other side
+    """
+    return 'computer' if side == 'player' else 'player'
+
+
+class Game:
+    """
+    The state of one game with no input or output.
+
+    Any number of games can be played side by side, each with its own random
+    generator. Either side can be played by the computer logic, so each side
+    keeps a number_count fed the same way main() feeds the computer's: with
+    its own hand, the starting piece and every piece that passes through
+    process_move().
+
+    Pieces are ints indexing PIECES and every hand, like the pieces on the
+    snake, is also kept as a bitmask, so whether a hand can play on an end
+    is one AND with NUMBER_MASKS. The hands stay lists too, since moves are
+    numbered by their order. The snake is a deque of the tuples of PIECES
+    and FLIPPED, so playing a piece on either end never allocates or shifts
+    the others. Its end numbers and how often each number is on it are kept
+    as pieces are played, so the draw check of check_ends() doesn't walk the
+    snake.
+    """
+    stock_pieces: list
+    pieces: dict
+    masks: dict
+    board: int
+    counts: dict
+    domino_snake: deque
+    left: int
+    right: int
+    played: list
+    turn: str
+    turns: int
+    rng: random.Random
+
+    def __init__(self, rng=random) -> None:
+        """
+        Shuffles and deals a new game.
+
+        The stock is in the same order as the lists main() shuffles, so a
+        seed deals the same game either way.
+
+        :param rng: the random generator used to shuffle the stock, kept for
+        strategies that make random choices
+        """
+        self.rng = rng
+        self.stock_pieces = list(range(len(PIECES)))
+        rng.shuffle(self.stock_pieces)
+        computer_pieces = [self.stock_pieces.pop() for _ in range(7)]
+        player_pieces = [self.stock_pieces.pop() for _ in range(7)]
+        self.pieces = {'computer': computer_pieces, 'player': player_pieces}
+        # pieces are numbered in list order, so the highest number is the
+        # max() of pick_starting_piece()
+        piece, self.turn = pick_starting_piece(computer_pieces, player_pieces)
+        self.domino_snake = deque([PIECES[piece]])
+        self.left, self.right = PIECES[piece]
+        self.played = [0, 0, 0, 0, 0, 0, 0]
+        add_count(self.played, PIECES[piece])
+        self.masks = {side: hand_mask(self.pieces[side]) for side in SIDES}
+        self.board = 1 << piece
+        self.counts = {}
+        for side in SIDES:
+            self.counts[side] = [0, 0, 0, 0, 0, 0, 0]
+            init_count(self.counts[side],
+                       [PIECES[piece] for piece in self.pieces[side]],
+                       self.domino_snake)
+        self.turns = 0
+
+    def result(self) -> str | None:
+        """
+        Checks for the end of the game in the same order as main().
+
+        :return: the winning side, 'draw', or None while the game goes on
+        """
+        if not self.masks['player']:
+            return 'player'
+        if not self.masks['computer']:
+            return 'computer'
+        if self.blocked() or len(self.stock_pieces) == 0:
+            return 'draw'
+        return None
+
+    def blocked(self) -> bool:
+        """
+        :return: what check_ends() returns for the snake
+        """
+        return blocked(self.left, self.right, self.played)
+
+    def can_play(self) -> bool:
+        """
+        :return: whether the side whose turn it is has a piece that fits
+        either end of the snake
+        """
+        ends = NUMBER_MASKS[self.left] | NUMBER_MASKS[self.right]
+        return bool(self.masks[self.turn] & ends)
+
+    def computer_move(self) -> int:
+        """
+        :return: the move process_computer_move() would make for the side
+        whose turn it is
+        """
+        moves = self.ranked_moves()
+        return moves[0] if moves else 0
+
+    def ranked_moves(self) -> list:
+        """
+        :return: ranked_moves() for the side whose turn it is
+        """
+        if not self.can_play():
+            return []
+        hand = self.pieces[self.turn]
+        return ranked_moves([PIECES[piece] for piece in hand],
+                            self.counts[self.turn], self.left, self.right,
+                            [SCORES[piece] for piece in hand])
+
+    def legal_moves(self) -> list:
+        """
+        :return: every legal move of the side whose turn it is, right end
+        before left for each piece, drawing from the stock last
+        """
+        moves = []
+        if self.can_play():
+            left, right = self.left, self.right
+            for count, piece in enumerate(self.pieces[self.turn], 1):
+                if right in PIECES[piece]:
+                    moves.append(count)
+                if left in PIECES[piece]:
+                    moves.append(-count)
+        if self.stock_pieces:
+            moves.append(0)
+        return moves
+
+    def play(self, move) -> None:
+        """
+        Makes a move for the side whose turn it is and passes the turn.
+
+        :param move: a move in the form process_move() takes
+        :raises ValueError: if the move isn't legal
+        """
+        side = self.turn
+        pieces = self.pieces[side]
+        if move == 0:
+            if not self.stock_pieces:
+                raise ValueError(f'illegal move {move}')
+            piece = self.stock_pieces.pop()
+            pieces.append(piece)
+            self.masks[side] |= 1 << piece
+        else:
+            if not len(pieces) >= move >= -len(pieces):
+                raise ValueError(f'illegal move {move}')
+            piece = pieces[abs(move) - 1]
+            if move > 0:
+                if self.right not in PIECES[piece]:
+                    raise ValueError(f'illegal move {move}')
+                placed = (PIECES[piece] if PIECES[piece][0] == self.right
+                          else FLIPPED[piece])
+                self.domino_snake.append(placed)
+                self.right = placed[1]
+            else:
+                if self.left not in PIECES[piece]:
+                    raise ValueError(f'illegal move {move}')
+                placed = (PIECES[piece] if PIECES[piece][1] == self.left
+                          else FLIPPED[piece])
+                self.domino_snake.appendleft(placed)
+                self.left = placed[0]
+            add_count(self.played, placed)
+            del pieces[abs(move) - 1]
+            self.masks[side] &= ~(1 << piece)
+            self.board |= 1 << piece
+        add_count(self.counts[side], PIECES[piece])
+        add_count(self.counts[opponent(side)], PIECES[piece])
+        self.turn = opponent(side)
+        self.turns += 1
+
+
+def play_game(rng, strategies=None) -> Game:
+    """
+    Plays one game to the end with no input or output.
+
+    :param rng: the random generator used to shuffle the stock
+    :param strategies: maps a side to a callable taking the Game and
+    returning that side's move, sides not given use Game.computer_move
+    :return: the finished game
+    """
+    strategies = strategies or {}
+    game = Game(rng)
+    while game.result() is None:
+        game.play(strategies.get(game.turn, Game.computer_move)(game))
+    return game
+
+
+def game_seed(seed, number) -> int:
+    """
+    :return: the seed of game number of a run, so a game can be replayed
+    without the games before it
+    """
+    return seed << 32 | number
+
+
+def simulate(games, seed=0, strategies=None, first=0) -> dict:
+    """
+    Plays games computer against computer and counts the results.
+
+    :param games: number of games to play
+    :param seed: seed of the run, every game gets its own seed from it
+    :param strategies: see play_game()
+    :param first: number of the first game, for splitting a run into parts
+    :return: counts of wins per side and draws, turns played and speed
+    """
+    results = {'player': 0, 'computer': 0, 'draw': 0}
+    turns = 0
+    started = time.perf_counter()
+    for number in range(first, first + games):
+        game = play_game(random.Random(game_seed(seed, number)), strategies)
+        results[game.result()] += 1
+        turns += game.turns
+    seconds = time.perf_counter() - started
+    return {'games': games, **results, 'turns': turns, 'seconds': seconds,
+            'games_per_second': games / seconds if seconds else 0.0}
+
+
+def show_simulation(stats) -> str:
+    """
+    :param stats: the result of simulate()
+    :return: a readable summary
+    """
+    games = stats['games']
+    return (f"Games: {games}\n"
+            f"Player wins: {stats['player']} ({stats['player'] / games:.1%})\n"
+            f"Computer wins: {stats['computer']} "
+            f"({stats['computer'] / games:.1%})\n"
+            f"Draws: {stats['draw']} ({stats['draw'] / games:.1%})\n"
+            f"Average turns: {stats['turns'] / games:.1f}\n"
+            f"Games per second: {stats['games_per_second']:.0f}")
+
+
+def play_console() -> None:
     # store ai hand and snake number counts
     number_count = [0, 0, 0, 0, 0, 0, 0]
     global game_state
@@ -337,7 +667,7 @@ def main() -> None:
     random.shuffle(stock_pieces)
     computer_pieces = [stock_pieces.pop() for _ in range(7)]
     player_pieces = [stock_pieces.pop() for _ in range(7)]
-    domino_snake = [find_starting_piece(computer_pieces, player_pieces)]
+    domino_snake = deque([find_starting_piece(computer_pieces, player_pieces)])
     init_count(number_count, computer_pieces, domino_snake)
 
     # loops until win condition test breaks loop
@@ -378,5 +708,20 @@ def main() -> None:
             game_state = 'player'
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play dominoes against the '
+                                                 'computer.')
+    parser.add_argument('--simulate', type=int, metavar='GAMES',
+                        help='play computer against computer with no '
+                             'output and show statistics')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for simulated games')
+    args = parser.parse_args()
+    if args.simulate:
+        print(show_simulation(simulate(args.simulate, args.seed)))
+    else:
+        play_console()
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,192 @@
+import itertools
+import math
+import time
+
+from dominoes import NUMBER_MASKS, PIECES, blocked
+from search import ALL_PIECES, DRAW, game_view, pieces_of, to_move
+
+# positions with more deals of the hidden pieces than this are left to
+# the fallback strategy
+DEALS = 120
+# seconds to solve a move in before giving up and using the fallback, kept
+# short of 10 ms to leave room for unwinding the search
+BUDGET = 0.006
+
+
+def solve(mover, other, left, right, stock, memo, alpha=-1, beta=1,
+          deadline=None) -> int:
+    """
+    Negamax with alpha-beta pruning over a position with every piece known.
+
+    The game ends in a draw as soon as the stock is empty, so the stock
+    bounds the depth of the search. The pieces on the snake follow from
+    the hands and the stock, and so does how many times the number at
+    both ends was played, which is all blocked() needs.
+
+    :param mover: hand of the side to move, as a mask
+    :param other: hand of the other side, as a mask
+    :param left: the number at the left end of the snake
+    :param right: the number at the right end of the snake
+    :param stock: the stock, drawn from the end
+    :param memo: bounds of the values of positions already searched with
+    this stock, keyed on the hands, the ends and the length of the stock,
+    which is enough as the stock is only ever drawn from the end
+    :param alpha: the value the side to move is already sure of
+    :param beta: the value the other side is already sure to hold it to
+    :param deadline: time.perf_counter() value to give up at, None for no
+    limit
+    :raises TimeoutError: if the deadline passes
+    :return: 1 if the side to move wins with best play, -1 if it loses,
+    0 for a draw, exact when between alpha and beta and otherwise a bound
+    on the same side of them
+    """
+    if not other:
+        return -1
+    if not stock:
+        return 0
+    if left == right:
+        board = ALL_PIECES & ~mover & ~other
+        for piece in stock:
+            board &= ~(1 << piece)
+        played = [0, 0, 0, 0, 0, 0, 0]
+        played[left] = sum(PIECES[piece].count(left)
+                           for piece in pieces_of(board & NUMBER_MASKS[left]))
+        if blocked(left, right, played):
+            return 0
+    key = (mover | other << 28 | left << 56 | right << 59
+           | len(stock) << 62)
+    lower, upper = memo.get(key, (-1, 1))
+    if lower >= beta or lower == upper:
+        return lower
+    if upper <= alpha:
+        return upper
+    if deadline is not None and time.perf_counter() > deadline:
+        raise TimeoutError('endgame search ran out of time')
+    alpha, beta = max(alpha, lower), min(beta, upper)
+    start = alpha
+    best = -1
+    if len(stock) == 1:
+        # drawing the last piece is a draw, so the side to move is sure of
+        # one and only needs to search for a win
+        best = 0
+        alpha = max(alpha, best)
+        if alpha >= beta:
+            return best
+    # moves on the right end, then the left, then drawing: each else runs
+    # only when the loop before it ended without a cutoff
+    for piece in pieces_of(mover & NUMBER_MASKS[right]):
+        a, b = PIECES[piece]
+        best = max(best, -solve(other, mover & ~(1 << piece), left,
+                                b if a == right else a, stock, memo,
+                                -beta, -alpha, deadline))
+        alpha = max(alpha, best)
+        if alpha >= beta:
+            break
+    else:
+        for piece in pieces_of(mover & NUMBER_MASKS[left]):
+            a, b = PIECES[piece]
+            best = max(best, -solve(other, mover & ~(1 << piece),
+                                    b if a == left else a, right, stock,
+                                    memo, -beta, -alpha, deadline))
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                break
+        else:
+            if len(stock) > 1:
+                best = max(best, -solve(other, mover | 1 << stock[-1], left,
+                                        right, stock[:-1], memo, -beta,
+                                        -alpha, deadline))
+    if best <= start:
+        memo[key] = lower, best
+    elif best >= beta:
+        memo[key] = best, upper
+    else:
+        memo[key] = best, best
+    return best
+
+
+def deals(game) -> int:
+    """
+    :return: the number of ways the pieces the side to move can't see could
+    be split between the other hand and the stock, stock order included
+    """
+    unseen = len(PIECES) - game.masks[game.turn].bit_count() \
+        - game.board.bit_count()
+    return math.perm(unseen, len(game.stock_pieces))
+
+
+def action_values(game, deadline=None) -> dict:
+    """
+    Values every action of the side to move over every deal of the pieces
+    it can't see.
+
+    :param game: a Game
+    :param deadline: see solve()
+    :raises TimeoutError: if the deadline passes
+    :return: the total value of each action over all deals, see solve()
+    """
+    own, board, left, right, _, stock_size, _, _ = game_view(game)
+    unseen = list(pieces_of(ALL_PIECES & ~own & ~board))
+    actions = [piece << 1 for piece in pieces_of(own & NUMBER_MASKS[right])]
+    actions += [piece << 1 | 1
+                for piece in pieces_of(own & NUMBER_MASKS[left])]
+    actions.append(DRAW)
+    values = dict.fromkeys(actions, 0)
+    for stock in itertools.permutations(unseen, stock_size):
+        other = ALL_PIECES & ~own & ~board
+        for piece in stock:
+            other &= ~(1 << piece)
+        memo = {}
+        for action in actions:
+            if action == DRAW:
+                hand, ends, rest = own | 1 << stock[-1], (left, right), \
+                    stock[:-1]
+            else:
+                a, b = PIECES[action >> 1]
+                hand, rest = own & ~(1 << (action >> 1)), stock
+                if action & 1:
+                    ends = b if a == left else a, right
+                else:
+                    ends = left, b if a == right else a
+            values[action] -= solve(other, hand, *ends, rest, memo,
+                                    deadline=deadline)
+    return values
+
+
+class EndgamePlayer:
+    """
+    A strategy for Game playing the fallback strategy until few enough
+    pieces are hidden to solve the rest of the game for every deal of them.
+
+    It then plays the action with the best total value over all deals,
+    which is exact when the hidden pieces are known and otherwise assumes
+    either side could play as if it knew them. Among equally good actions
+    it keeps the fallback's move, which it also plays when solving takes
+    longer than the budget.
+    """
+
+    def __init__(self, fallback=None, limit=DEALS, budget=BUDGET):
+        """
+        :param fallback: the strategy to use before the endgame, None for
+        Game.computer_move
+        :param limit: the most deals of the hidden pieces to solve for
+        :param budget: seconds to solve a move in, None for no limit
+        """
+        self.fallback = fallback
+        self.limit = limit
+        self.budget = budget
+
+    def __call__(self, game) -> int:
+        fallback = (self.fallback or type(game).computer_move)(game)
+        if deals(game) > self.limit or len(game.legal_moves()) == 1:
+            return fallback
+        deadline = (time.perf_counter() + self.budget
+                    if self.budget is not None else None)
+        try:
+            values = action_values(game, deadline)
+        except TimeoutError:
+            return fallback
+        best = max(values.values())
+        moves = [to_move(game, action) for action, value in values.items()
+                 if value == best]
+        return fallback if fallback in moves else moves[0]
@@ -0,0 +1,244 @@
+import argparse
+import random
+import struct
+import time
+
+from dominoes import PIECES, SIDES, Game, blocked, game_seed
+from search import DRAW, DRAWN, World
+
+FILE_MAGIC = b'DOM1'
+RECORD_HEADER = '<QBB'  # seed of the deal, starting piece, number of moves
+# game_seed() puts the run seed above 32 bits of game number, so both have
+# to fit in 32 bits for the seed of a deal to fit in the header
+SEED_LIMIT = 1 << 32
+
+
+def to_action(game, move) -> int:
+    """
+    :param game: a Game before the move is played
+    :param move: a move in the form Game.play() takes
+    :return: the move as a search action, which fits in one byte and
+    doesn't depend on the order of the hand
+    """
+    if move == 0:
+        return DRAW
+    piece = game.pieces[game.turn][abs(move) - 1]
+    return piece << 1 | (move < 0)
+
+
+def record_game(seed, strategies=None) -> tuple:
+    """
+    Plays one game like play_game(), keeping its moves.
+
+    :param seed: seed of the random generator dealing the game
+    :param strategies: see play_game()
+    :return: the finished game, its starting piece and its moves as actions
+    """
+    strategies = strategies or {}
+    game = Game(random.Random(seed))
+    start = PIECES.index(game.domino_snake[0])
+    actions = bytearray()
+    while game.result() is None:
+        move = strategies.get(game.turn, Game.computer_move)(game)
+        actions.append(to_action(game, move))
+        game.play(move)
+    return game, start, bytes(actions)
+
+
+class GameLog:
+    """
+    Appends games to a log file, each as its seed, its starting piece and
+    one byte for every move.
+
+    A game is 10 bytes plus its moves, and the seed deals every hand again,
+    so nothing else about it needs storing.
+    """
+
+    def __init__(self, path) -> None:
+        """
+        :param path: the log, created with its header if missing or empty
+        """
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_MAGIC)
+
+    def append(self, seed, start, actions) -> None:
+        """
+        :param seed: seed of the random generator that dealt the game
+        :param start: the starting piece
+        :param actions: the moves as actions, see to_action()
+        :raises ValueError: if the seed doesn't fit in a record
+        """
+        if not 0 <= seed < SEED_LIMIT * SEED_LIMIT:
+            raise ValueError(f'seed {seed} does not fit in a game log')
+        self.file.write(struct.pack(RECORD_HEADER, seed, start, len(actions)))
+        self.file.write(actions)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_games(path):
+    """
+    Yields the (seed, start, actions) of every game in a log, reading one
+    record at a time.
+    """
+    size = struct.calcsize(RECORD_HEADER)
+    with open(path, 'rb') as file:
+        if file.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f'{path} is not a game log')
+        while header := file.read(size):
+            if len(header) < size:
+                raise ValueError(f'{path} ends inside a record')
+            seed, start, length = struct.unpack(RECORD_HEADER, header)
+            actions = file.read(length)
+            if len(actions) < length:
+                raise ValueError(f'{path} ends inside a record')
+            yield seed, start, actions
+
+
+def deal(seed, start) -> World:
+    """
+    Deals a logged game again, the way Game does, as a World.
+
+    :raises ValueError: if the deal's starting piece isn't start
+    """
+    stock = list(range(len(PIECES)))
+    random.Random(seed).shuffle(stock)
+    hands = {'computer': [stock.pop() for _ in range(7)],
+             'player': [stock.pop() for _ in range(7)]}
+    starter = max(SIDES, key=lambda side: max(hands[side]))
+    if max(hands[starter]) != start:
+        raise ValueError(f'game {seed} did not start with piece {start}')
+    masks = [0, 0]
+    for turn, side in enumerate(SIDES):
+        for piece in hands[side]:
+            if piece != start:
+                masks[turn] |= 1 << piece
+    left, right = PIECES[start]
+    played = [0, 0, 0, 0, 0, 0, 0]
+    played[left] += 1
+    played[right] += 1
+    return World(masks, stock, 1 << start, left, right, played,
+                 1 - SIDES.index(starter))
+
+
+def replay(seed, start, actions) -> World:
+    """
+    Replays a logged game without building Game objects.
+
+    :return: the World at the end of the game
+    :raises ValueError: if the moves don't make a finished game
+    """
+    world = deal(seed, start)
+    for action in actions:
+        if world.result() is not None:
+            raise ValueError(f'game {seed} has moves after its end')
+        world.play(action)
+    if world.result() is None:
+        raise ValueError(f'game {seed} ends before its result')
+    return world
+
+
+def aggregate(path) -> dict:
+    """
+    Replays every game of a log and counts how they ended.
+
+    Draws are split into a blocked snake, what check_ends() finds, and an
+    empty stock. The side moving first is the one that didn't hold the
+    starting piece.
+
+    :param path: the log
+    :return: counts of games, results and wins by who moved first, and the
+    average number of moves
+    """
+    stats = {'games': 0, 'moves': 0, 'player': 0, 'computer': 0,
+             'blocked': 0, 'stock': 0, 'first': 0, 'second': 0}
+    for seed, start, actions in read_games(path):
+        world = replay(seed, start, actions)
+        result = world.result()
+        stats['games'] += 1
+        stats['moves'] += len(actions)
+        if result == DRAWN:
+            stuck = blocked(world.left, world.right, world.played)
+            stats['blocked' if stuck else 'stock'] += 1
+            continue
+        stats[SIDES[result]] += 1
+        # turns alternate from the first mover, so the one who moved last
+        # and won is the first mover if there was an odd number of moves
+        stats['first' if len(actions) % 2 else 'second'] += 1
+    stats['average_moves'] = (stats['moves'] / stats['games']
+                              if stats['games'] else 0.0)
+    return stats
+
+
+def show_stats(stats) -> str:
+    """
+    :param stats: the result of aggregate()
+    :return: a readable summary
+    """
+    games = stats['games'] or 1
+    wins = stats['first'] + stats['second'] or 1
+    return (f"Games: {stats['games']}\n"
+            f"Player wins: {stats['player']} ({stats['player'] / games:.1%})\n"
+            f"Computer wins: {stats['computer']} "
+            f"({stats['computer'] / games:.1%})\n"
+            f"Draws, blocked snake: {stats['blocked']} "
+            f"({stats['blocked'] / games:.1%})\n"
+            f"Draws, empty stock: {stats['stock']} "
+            f"({stats['stock'] / games:.1%})\n"
+            f"Wins by the first mover: {stats['first']} "
+            f"({stats['first'] / wins:.1%} of wins)\n"
+            f"Average moves: {stats['average_moves']:.1f}")
+
+
+def uint32(text) -> int:
+    """
+    An argparse type for the seed of a run and the number of games, which
+    game_seed() needs below SEED_LIMIT.
+    """
+    value = int(text)
+    if not 0 <= value < SEED_LIMIT:
+        raise argparse.ArgumentTypeError(f'{value} is not between 0 and '
+                                         f'{SEED_LIMIT - 1}')
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Record simulated dominoes '
+                                                 'games and analyse them.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help='simulate games and append '
+                                                'them to a log')
+    record.add_argument('path', help='the log')
+    record.add_argument('-g', '--games', type=uint32, default=10_000,
+                        help='number of games to play')
+    record.add_argument('--seed', type=uint32, default=0,
+                        help='seed of the run')
+    stats = commands.add_parser('stats', help='replay a log and show '
+                                              'statistics')
+    stats.add_argument('path', help='the log')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == 'record':
+        with GameLog(args.path) as log:
+            for number in range(args.games):
+                seed = game_seed(args.seed, number)
+                _, start, actions = record_game(seed)
+                log.append(seed, start, actions)
+        print(f'Recorded {args.games} games in '
+              f'{time.perf_counter() - started:.2f}s')
+    else:
+        print(show_stats(aggregate(args.path)))
+        print(f'Replayed in {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from server import HOST, serve
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+async def play_session(host, port, games, seed, latencies, results) -> None:
+    """
+    Plays games one after another over one connection, picking a random
+    legal move each turn.
+
+    :param host: address of the server
+    :param port: port of the server
+    :param games: number of games to play
+    :param seed: seed of the games and of the moves picked
+    :param latencies: list the seconds of every move's round trip are
+    added to
+    :param results: dict counting the results of the games
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            writer.write(f'NEW {rng.getrandbits(32)}\n'.encode())
+            await writer.drain()
+            state = json.loads(await reader.readline())
+            while state['result'] is None:
+                started = time.perf_counter()
+                writer.write(f"MOVE {rng.choice(state['moves'])}\n".encode())
+                await writer.drain()
+                state = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - started)
+                if 'error' in state:
+                    raise RuntimeError(state['error'])
+            results[state['result']] = results.get(state['result'], 0) + 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def load(host, port, sessions, games, seed=0) -> dict:
+    """
+    Plays games over many connections at once.
+
+    :param host: address of the server
+    :param port: port of the server, None to start one in this process
+    :param sessions: number of connections
+    :param games: number of games to play on each connection
+    :param seed: seed of the run
+    :return: latency percentiles of moves, throughput and results
+    """
+    server = None
+    if port is None:
+        started = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(serve(host, 0, started))
+        port = await started
+    latencies = []
+    results = {}
+    began = time.perf_counter()
+    try:
+        await asyncio.gather(*(
+            play_session(host, port, games, seed << 32 | session, latencies,
+                         results)
+            for session in range(sessions)))
+    finally:
+        if server is not None:
+            server.cancel()
+    seconds = time.perf_counter() - began
+    latencies.sort()
+    return {
+        'sessions': sessions,
+        'games': sum(results.values()),
+        'moves': len(latencies),
+        'seconds': seconds,
+        'moves_per_second': len(latencies) / seconds if seconds else 0.0,
+        'percentiles': {
+            percentile: latencies[min(len(latencies) - 1,
+                                      int(len(latencies) * percentile / 100))]
+            for percentile in PERCENTILES} if latencies else {},
+        'max': latencies[-1] if latencies else 0.0,
+        'results': results,
+    }
+
+
+def show_load(report) -> str:
+    """
+    :param report: the result of load()
+    :return: a readable summary
+    """
+    lines = [f"Sessions: {report['sessions']}, games: {report['games']}, "
+             f"moves: {report['moves']} in {report['seconds']:.2f}s "
+             f"({report['moves_per_second']:.0f} moves/s)"]
+    for percentile, seconds in report['percentiles'].items():
+        lines.append(f"p{percentile}: {seconds * 1e3:.2f} ms")
+    lines.append(f"max: {report['max'] * 1e3:.2f} ms")
+    lines.append('Results: ' + ', '.join(
+        f'{result} {count}' for result, count in
+        sorted(report['results'].items())))
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play many games against '
+                                                 'the dominoes server at '
+                                                 'once and time every move.')
+    parser.add_argument('--host', default=HOST, help='address of the server')
+    parser.add_argument('--port', type=int,
+                        help='port of the server, without it a server is '
+                             'started in this process')
+    parser.add_argument('-s', '--sessions', type=int, default=1000,
+                        help='number of connections')
+    parser.add_argument('-g', '--games', type=int, default=3,
+                        help='number of games played on each connection')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the run')
+    args = parser.parse_args()
+    print(show_load(asyncio.run(load(args.host, args.port, args.sessions,
+                                     args.games, args.seed))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dominoes import NUMBER_MASKS, PIECES, SIDES, blocked
+
+ALL_PIECES = (1 << len(PIECES)) - 1
+# actions are piece << 1 for the right end and piece << 1 | 1 for the left,
+# so they don't depend on the order of the hand like moves do
+DRAW = len(PIECES) << 1
+DRAWN = len(SIDES)
+BUDGET = 0.05
+EXPLORATION = 0.7
+
+
+def pieces_of(mask):
+    """
+    :param mask: a bitmask of pieces
+    :return: the pieces of the mask as ints, lowest first
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class World:
+    """
+    One way the pieces hidden from the side to move could lie, making the
+    whole game known.
+
+    Hands and the pieces on the snake are bitmasks and sides are indexes of
+    SIDES. The order of the snake and the hands isn't kept, only what the
+    rules need: the end numbers and how often each number has been played.
+    """
+    __slots__ = ('hands', 'stock', 'board', 'left', 'right', 'played',
+                 'turn')
+
+    def __init__(self, hands, stock, board, left, right, played, turn):
+        self.hands = hands
+        self.stock = stock
+        self.board = board
+        self.left = left
+        self.right = right
+        self.played = played
+        self.turn = turn
+
+    @classmethod
+    def deal(cls, view, rng):
+        """
+        Deals the pieces the side to move can't see at random.
+
+        :param view: what the side to move knows, see game_view()
+        :param rng: the random generator to deal with
+        :return: a World agreeing with the view
+        """
+        own, board, left, right, played, stock_size, other_size, turn = view
+        unseen = list(pieces_of(ALL_PIECES & ~own & ~board))
+        rng.shuffle(unseen)
+        hands = [0, 0]
+        hands[turn] = own
+        for piece in unseen[stock_size:]:
+            hands[1 - turn] |= 1 << piece
+        return cls(hands, unseen[:stock_size], board, left, right,
+                   list(played), turn)
+
+    def key(self) -> int:
+        """
+        Packs what the side to move knows into one int, so positions the
+        side can't tell apart share statistics however they were reached.
+        """
+        return (self.hands[self.turn]
+                | self.board << 28
+                | self.left << 56
+                | self.right << 59
+                | len(self.stock) << 62
+                | self.hands[1 - self.turn].bit_count() << 67
+                | self.turn << 72)
+
+    def result(self) -> int | None:
+        """
+        :return: the index of the winning side, DRAWN, or None while the
+        game goes on, checked in the same order as Game.result()
+        """
+        if not self.hands[0]:
+            return 0
+        if not self.hands[1]:
+            return 1
+        if blocked(self.left, self.right, self.played) or not self.stock:
+            return DRAWN
+        return None
+
+    def actions(self) -> list:
+        """
+        :return: the legal actions of the side to move
+        """
+        hand = self.hands[self.turn]
+        actions = [piece << 1
+                   for piece in pieces_of(hand & NUMBER_MASKS[self.right])]
+        actions += [piece << 1 | 1
+                    for piece in pieces_of(hand & NUMBER_MASKS[self.left])]
+        if self.stock:
+            actions.append(DRAW)
+        return actions
+
+    def play(self, action) -> None:
+        """
+        Makes an action for the side to move and passes the turn.
+        """
+        if action == DRAW:
+            self.hands[self.turn] |= 1 << self.stock.pop()
+        else:
+            piece = action >> 1
+            a, b = PIECES[piece]
+            if action & 1:
+                self.left = b if a == self.left else a
+            else:
+                self.right = b if a == self.right else a
+            self.hands[self.turn] &= ~(1 << piece)
+            self.board |= 1 << piece
+            self.played[a] += 1
+            self.played[b] += 1
+        self.turn ^= 1
+
+    def rollout(self, rng) -> int:
+        """
+        Plays the game out, each side playing a random piece that fits and
+        drawing only when none does.
+
+        :return: the result, see result()
+        """
+        while (result := self.result()) is None:
+            hand = self.hands[self.turn]
+            right = hand & NUMBER_MASKS[self.right]
+            left = hand & NUMBER_MASKS[self.left]
+            if right | left:
+                piece = rng.choice(list(pieces_of(right | left)))
+                bit = 1 << piece
+                if right & bit and left & bit:
+                    end = rng.getrandbits(1)
+                else:
+                    end = 0 if right & bit else 1
+                self.play(piece << 1 | end)
+            else:
+                self.play(DRAW)
+        return result
+
+
+def score(result, side) -> float:
+    """
+    :return: 1 if side won, 0.5 for a draw, 0 if side lost
+    """
+    if result == DRAWN:
+        return 0.5
+    return 1.0 if result == side else 0.0
+
+
+def game_view(game) -> tuple:
+    """
+    :param game: a Game
+    :return: what the side to move knows, in a form worker processes can
+    take
+    """
+    turn = SIDES.index(game.turn)
+    other = SIDES[1 - turn]
+    return (game.masks[game.turn], game.board, game.left, game.right,
+            tuple(game.played), len(game.stock_pieces),
+            len(game.pieces[other]), turn)
+
+
+def search(view, iterations=None, budget=BUDGET, seed=0) -> dict:
+    """
+    Determinized Monte Carlo tree search from the position of a view.
+
+    Every iteration deals the hidden pieces again, walks down the tree with
+    UCB1 among the actions legal in that deal, adds one node and plays the
+    rest of the game out at random. Nodes are kept in a transposition table
+    keyed by World.key(), so they hold statistics of everything the side to
+    move can't tell apart.
+
+    :param view: what the side to move knows, see game_view()
+    :param iterations: stop after this many iterations, None for no limit
+    :param budget: stop after this many seconds, None for no limit
+    :param seed: seed of the random generator dealing and playing out
+    :return: visits and total score of each action at the root
+    """
+    if iterations is None and budget is None:
+        raise ValueError('iterations and budget cannot both be None')
+    rng = random.Random(seed)
+    table = {}
+    root = World.deal(view, rng).key()
+    deadline = time.perf_counter() + budget if budget is not None else None
+    done = 0
+    while (iterations is None or done < iterations) and \
+            (deadline is None or time.perf_counter() < deadline):
+        world = World.deal(view, rng)
+        path = []
+        while world.result() is None:
+            node = table.setdefault(world.key(), [0, {}])
+            actions = world.actions()
+            untried = [action for action in actions if action not in node[1]]
+            if untried:
+                action = rng.choice(untried)
+                node[1][action] = [0, 0.0]
+            else:
+                log_visits = math.log(node[0])
+                action = max(actions, key=lambda a: (
+                    node[1][a][1] / node[1][a][0]
+                    + EXPLORATION * math.sqrt(log_visits / node[1][a][0])))
+            path.append((node, action, world.turn))
+            world.play(action)
+            if untried:
+                break
+        result = world.rollout(rng)
+        for node, action, side in path:
+            node[0] += 1
+            stats = node[1][action]
+            stats[0] += 1
+            stats[1] += score(result, side)
+        done += 1
+    return table.get(root, [0, {}])[1]
+
+
+def to_move(game, action) -> int:
+    """
+    :return: the action as a move in the form Game.play() takes
+    """
+    if action == DRAW:
+        return 0
+    move = game.pieces[game.turn].index(action >> 1) + 1
+    return -move if action & 1 else move
+
+
+class SearchPlayer:
+    """
+    A strategy for Game choosing moves by search(), usable wherever the
+    strategies of tournament.py are.
+
+    With more than one worker every worker searches the same position with
+    its own seed for the whole budget, and the visits of their root actions
+    are added up. Seeds are drawn from the game's random generator, so with
+    a fixed number of iterations and no budget games are reproducible.
+    """
+
+    def __init__(self, budget=BUDGET, iterations=None, workers=None):
+        """
+        :param budget: seconds to search for every move, None for no limit
+        :param iterations: iterations of search() for every move and worker,
+        None for no limit
+        :param workers: number of worker processes, None or 1 searches in
+        this process
+        """
+        self.budget = budget
+        self.iterations = iterations
+        self.workers = workers
+        self.pool = None
+
+    def __getstate__(self):
+        # pools can't be pickled, a copy starts its own when it needs one
+        return {**self.__dict__, 'pool': None}
+
+    def __call__(self, game) -> int:
+        actions = game.legal_moves()
+        if len(actions) == 1:
+            return actions[0]
+        view = game_view(game)
+        seeds = [game.rng.getrandbits(32)
+                 for _ in range(max(self.workers or 1, 1))]
+        if len(seeds) == 1:
+            results = [search(view, self.iterations, self.budget, seeds[0])]
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(len(seeds))
+            futures = [self.pool.submit(search, view, self.iterations,
+                                        self.budget, seed) for seed in seeds]
+            results = [future.result() for future in futures]
+        visits = {}
+        for stats in results:
+            for action, (count, _) in stats.items():
+                visits[action] = visits.get(action, 0) + count
+        if not visits:
+            return game.computer_move()
+        return to_move(game, max(visits, key=visits.get))
+
+    def close(self) -> None:
+        """
+        Shuts the worker processes down.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import random
+
+from dominoes import PIECES, Game
+
+HOST = '127.0.0.1'
+PORT = 8765
+# longest command line a client may send, in bytes
+LINE_LIMIT = 1024
+# connections waiting to be accepted, enough for thousands of clients
+# connecting at once
+BACKLOG = 4096
+
+
+class Session:
+    """
+    One client's game against the computer.
+
+    All the state of a connection lives here, so a server process can host
+    as many games at once as it has connections.
+    """
+    game: Game | None
+
+    def __init__(self) -> None:
+        self.game = None
+
+    def state(self) -> dict:
+        """
+        :return: what the player can see of the game: the snake, their own
+        pieces numbered as moves refer to them, the sizes of the stock and
+        of the computer's hand, the legal moves and the result once over
+        """
+        game = self.game
+        result = game.result()
+        return {
+            'snake': [list(piece) for piece in game.domino_snake],
+            'pieces': [list(PIECES[piece])
+                       for piece in game.pieces['player']],
+            'stock': len(game.stock_pieces),
+            'computer': len(game.pieces['computer']),
+            'moves': game.legal_moves() if result is None else [],
+            'result': result,
+        }
+
+    def computer_turns(self) -> None:
+        """
+        Plays the computer's move if it is the computer's turn.
+        """
+        if self.game.result() is None and self.game.turn == 'computer':
+            self.game.play(self.game.computer_move())
+
+    def handle(self, line) -> dict:
+        """
+        Runs one command.
+
+        Commands are NEW [seed] to deal a new game, MOVE n to play a move
+        numbered like in the console game, and STATE to see the game again.
+        The computer moves as soon as it's its turn, so every answer shows
+        the player's turn or the end of the game.
+
+        :param line: the command
+        :return: the state of the game, or an error
+        """
+        command, *args = line.split() or ['']
+        command = command.upper()
+        if command == 'NEW':
+            try:
+                seed = int(args[0]) if args else None
+            except ValueError:
+                return {'error': 'seed must be an integer'}
+            self.game = Game(random.Random(seed))
+            self.computer_turns()
+            return self.state()
+        if command not in ('MOVE', 'STATE'):
+            return {'error': f'unknown command {command!r}'}
+        if self.game is None:
+            return {'error': 'no game, send NEW first'}
+        if command == 'STATE':
+            return self.state()
+        if self.game.result() is not None:
+            return {'error': 'the game is over, send NEW for another'}
+        try:
+            self.game.play(int(args[0]))
+        except (IndexError, ValueError):
+            return {'error': 'illegal move', **self.state()}
+        self.computer_turns()
+        return self.state()
+
+
+async def handle_client(reader, writer) -> None:
+    """
+    Serves one connection, a JSON object answering each command line.
+    """
+    session = Session()
+    try:
+        while line := await reader.readline():
+            answer = session.handle(line.decode(errors='replace'))
+            writer.write(json.dumps(answer).encode() + b'\n')
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        # ValueError is a line over LINE_LIMIT
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, started=None) -> None:
+    """
+    Accepts connections until cancelled.
+
+    :param host: address to listen on
+    :param port: port to listen on, 0 for any free one
+    :param started: a future set to the listening port once accepting
+    """
+    server = await asyncio.start_server(handle_client, host, port,
+                                        limit=LINE_LIMIT, backlog=BACKLOG)
+    if started is not None:
+        started.set_result(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Host dominoes games '
+                                                 'against the computer over '
+                                                 'TCP.')
+    parser.add_argument('--host', default=HOST, help='address to listen on')
+    parser.add_argument('--port', type=int, default=PORT,
+                        help='port to listen on')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import random
+from collections import deque
+
+import pytest
+
+from dominoes import (PIECES, SCORES, Game, add_count, check_ends,
+                      game_seed, init_count, opponent, pick_starting_piece,
+                      play_game, process_computer_move, ranked_moves,
+                      simulate)
+
+SEEDS = range(500)
+
+
+def play_lists(rng) -> tuple:
+    """
+    Plays a game computer against computer with the list pieces and the
+    functions of the console game, each side keeping a number_count the way
+    Game does.
+
+    :return: the result, the number of turns and the final snake
+    """
+    stock_pieces = [[x, y + x] for x in range(7) for y in range(7 - x)]
+    rng.shuffle(stock_pieces)
+    pieces = {'computer': [stock_pieces.pop() for _ in range(7)],
+              'player': [stock_pieces.pop() for _ in range(7)]}
+    piece, turn = pick_starting_piece(pieces['computer'], pieces['player'])
+    domino_snake = deque([piece])
+    counts = {}
+    for side in pieces:
+        counts[side] = [0, 0, 0, 0, 0, 0, 0]
+        init_count(counts[side], pieces[side], domino_snake)
+    turns = 0
+    while True:
+        if len(pieces['player']) == 0:
+            return 'player', turns, list(domino_snake)
+        if len(pieces['computer']) == 0:
+            return 'computer', turns, list(domino_snake)
+        if check_ends(domino_snake) or len(stock_pieces) == 0:
+            return 'draw', turns, list(domino_snake)
+        hand = pieces[turn]
+        before = list(hand)
+        process_computer_move(hand, counts[turn], domino_snake, stock_pieces)
+        if len(hand) > len(before):
+            piece = hand[-1]
+        else:
+            piece = next(x for x in before if x not in hand)
+        add_count(counts[opponent(turn)], piece)
+        turn = opponent(turn)
+        turns += 1
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_game_plays_like_the_console_logic(seed):
+    result, turns, snake = play_lists(random.Random(seed))
+    game = play_game(random.Random(seed))
+    assert game.result() == result
+    assert game.turns == turns
+    assert [list(piece) for piece in game.domino_snake] == snake
+    assert game.blocked() == check_ends(game.domino_snake)
+
+
+def test_scores_rank_like_the_pieces():
+    pieces = list(PIECES)
+    for left in range(7):
+        for right in range(7):
+            for counts in ([0, 1, 2, 3, 4, 5, 6], [7, 7, 2, 2, 0, 0, 1]):
+                assert ranked_moves(pieces, counts, left, right, SCORES) == \
+                    ranked_moves(pieces, counts, left, right)
+
+
+def test_game_tracks_masks_and_ends():
+    game = Game(random.Random(7))
+    while game.result() is None:
+        for side in ('player', 'computer'):
+            assert game.masks[side] == sum(1 << piece
+                                           for piece in game.pieces[side])
+        assert (game.left, game.right) == (game.domino_snake[0][0],
+                                           game.domino_snake[-1][1])
+        assert game.board == sum(1 << PIECES.index(tuple(sorted(piece)))
+                                 for piece in game.domino_snake)
+        game.play(game.legal_moves()[0])
+
+
+def test_play_rejects_illegal_moves():
+    game = Game(random.Random(1))
+    pieces = game.pieces[game.turn]
+    illegal = [move for move in range(-len(pieces), len(pieces) + 1)
+               if move not in game.legal_moves()]
+    for move in illegal + [len(pieces) + 1, -len(pieces) - 1]:
+        with pytest.raises(ValueError):
+            game.play(move)
+    assert game.turns == 0
+
+
+def test_simulate_is_reproducible():
+    first, second = simulate(200, seed=3), simulate(200, seed=3)
+    for key in ('player', 'computer', 'draw', 'turns'):
+        assert first[key] == second[key]
+    assert first['player'] + first['computer'] + first['draw'] == 200
+    game = play_game(random.Random(game_seed(3, 5)))
+    assert game.result() in ('player', 'computer', 'draw')
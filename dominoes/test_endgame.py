@@ -0,0 +1,108 @@
+import itertools
+import random
+from functools import cache
+
+import pytest
+
+from dominoes import NUMBER_MASKS, PIECES, Game, opponent
+from endgame import EndgamePlayer, action_values, deals, solve
+from search import ALL_PIECES, DRAW, pieces_of
+
+SEEDS = range(300)
+
+
+@cache
+def brute_force(mover, other, left, right, stock) -> int:
+    """
+    solve() without pruning: the best of every move, searched to the end.
+    """
+    if not other:
+        return -1
+    if not stock:
+        return 0
+    if left == right:
+        board = ALL_PIECES & ~mover & ~other
+        for piece in stock:
+            board &= ~(1 << piece)
+        if not NUMBER_MASKS[left] & ~board:
+            return 0
+    values = [-brute_force(other, mover | 1 << stock[-1], left, right,
+                           stock[:-1])]
+    for piece in pieces_of(mover & NUMBER_MASKS[right]):
+        a, b = PIECES[piece]
+        values.append(-brute_force(other, mover & ~(1 << piece), left,
+                                   b if a == right else a, stock))
+    for piece in pieces_of(mover & NUMBER_MASKS[left]):
+        a, b = PIECES[piece]
+        values.append(-brute_force(other, mover & ~(1 << piece),
+                                   b if a == left else a, right, stock))
+    return max(values)
+
+
+def small_positions(seed):
+    """
+    Yields every position of a game, as solve() takes it, once both hands
+    together hold at most 7 pieces and the stock at most 4.
+    """
+    game = Game(random.Random(seed))
+    while game.result() is None:
+        mover, other = game.masks[game.turn], game.masks[opponent(game.turn)]
+        if (mover.bit_count() + other.bit_count() <= 7
+                and len(game.stock_pieces) <= 4):
+            yield mover, other, game.left, game.right, \
+                tuple(game.stock_pieces)
+        # mix in random moves to reach positions the computer wouldn't
+        game.play(game.rng.choice(game.legal_moves()) if game.turns % 3
+                  else game.computer_move())
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_solve_matches_brute_force(seed):
+    memo = {}
+    for position in small_positions(seed):
+        assert solve(*position, memo) == brute_force(*position)
+        # a memo filled by other positions with the same stock still holds
+        assert solve(*position, {}) == brute_force(*position)
+
+
+@pytest.mark.parametrize('seed', range(0, 300, 10))
+def test_action_values_sum_brute_force_over_deals(seed):
+    game = Game(random.Random(seed))
+    while game.result() is None:
+        if deals(game) <= 30 and len(game.legal_moves()) > 1:
+            values = action_values(game)
+            own, left, right = game.masks[game.turn], game.left, game.right
+            hidden = list(pieces_of(ALL_PIECES & ~own & ~game.board))
+            expected = dict.fromkeys(values, 0)
+            for stock in itertools.permutations(hidden,
+                                                len(game.stock_pieces)):
+                other = ALL_PIECES & ~own & ~game.board
+                for piece in stock:
+                    other &= ~(1 << piece)
+                for action in values:
+                    if action == DRAW:
+                        expected[action] -= brute_force(
+                            other, own | 1 << stock[-1], left, right,
+                            stock[:-1])
+                        continue
+                    a, b = PIECES[action >> 1]
+                    hand = own & ~(1 << (action >> 1))
+                    if action & 1:
+                        ends = b if a == left else a, right
+                    else:
+                        ends = left, b if a == right else a
+                    expected[action] -= brute_force(other, hand, *ends,
+                                                    stock)
+            assert values == expected
+        game.play(game.computer_move())
+
+
+def test_endgame_player_plays_legal_moves():
+    player = EndgamePlayer(budget=None)
+    for seed in range(50):
+        game = Game(random.Random(seed))
+        while game.result() is None:
+            move = player(game) if game.turn == 'computer' \
+                else game.computer_move()
+            assert move in game.legal_moves()
+            game.play(move)
@@ -0,0 +1,93 @@
+import argparse
+
+import pytest
+
+from dominoes import SIDES, game_seed
+from gamelog import (FILE_MAGIC, SEED_LIMIT, GameLog, aggregate, read_games,
+                     record_game, replay, uint32)
+from search import DRAWN
+
+SEEDS = [game_seed(seed, number) for seed in (0, 1, SEED_LIMIT - 1)
+         for number in (0, 1, 2, SEED_LIMIT - 1)]
+
+
+def write_log(path, seeds) -> list:
+    """
+    :return: the finished Game of every seed, in the order they were logged
+    """
+    games = []
+    with GameLog(path) as log:
+        for seed in seeds:
+            game, start, actions = record_game(seed)
+            log.append(seed, start, actions)
+            games.append(game)
+    return games
+
+
+def test_logged_games_replay_to_their_results(tmp_path):
+    path = tmp_path / 'games.log'
+    games = write_log(path, SEEDS)
+    records = list(read_games(path))
+    assert [seed for seed, _, _ in records] == SEEDS
+    for game, (seed, start, actions) in zip(games, records):
+        assert len(actions) == game.turns
+        world = replay(seed, start, actions)
+        result = world.result()
+        assert game.result() == ('draw' if result == DRAWN
+                                 else SIDES[result])
+        assert world.hands == [game.masks[side] for side in SIDES]
+        assert world.board == game.board
+
+
+def test_appending_keeps_the_games_before(tmp_path):
+    path = tmp_path / 'games.log'
+    write_log(path, SEEDS[:3])
+    write_log(path, SEEDS[3:])
+    assert [seed for seed, _, _ in read_games(path)] == SEEDS
+    stats = aggregate(path)
+    assert stats['games'] == len(SEEDS)
+    assert (stats['player'] + stats['computer'] + stats['blocked']
+            + stats['stock']) == len(SEEDS)
+    assert stats['first'] + stats['second'] == (stats['player']
+                                                + stats['computer'])
+
+
+def test_truncated_log_raises(tmp_path):
+    path = tmp_path / 'games.log'
+    write_log(path, SEEDS[:2])
+    data = path.read_bytes()
+    for end in (len(data) - 1, len(FILE_MAGIC) + 5):
+        path.write_bytes(data[:end])
+        with pytest.raises(ValueError, match='ends inside a record'):
+            list(read_games(path))
+
+
+def test_other_files_are_not_logs(tmp_path):
+    path = tmp_path / 'games.log'
+    path.write_bytes(b'DOM0')
+    with pytest.raises(ValueError, match='not a game log'):
+        list(read_games(path))
+
+
+def test_replay_rejects_wrong_records():
+    game, start, actions = record_game(SEEDS[0])
+    with pytest.raises(ValueError, match='did not start'):
+        replay(SEEDS[0], (start + 1) % 28, actions)
+    with pytest.raises(ValueError, match='before its result'):
+        replay(SEEDS[0], start, actions[:-1])
+
+
+@pytest.mark.parametrize('seed', [-1, SEED_LIMIT * SEED_LIMIT])
+def test_append_rejects_seeds_out_of_range(tmp_path, seed):
+    path = tmp_path / 'games.log'
+    with GameLog(path) as log:
+        with pytest.raises(ValueError):
+            log.append(seed, 0, b'')
+    assert path.read_bytes() == FILE_MAGIC
+
+
+@pytest.mark.parametrize('text', ['-1', str(SEED_LIMIT), 'seed'])
+def test_run_seed_out_of_range(text):
+    with pytest.raises((argparse.ArgumentTypeError, ValueError)):
+        uint32(text)
+    assert uint32(str(SEED_LIMIT - 1)) == SEED_LIMIT - 1
@@ -0,0 +1,148 @@
+import random
+
+import pytest
+
+from dominoes import SIDES, Game
+from search import (DRAW, DRAWN, SearchPlayer, World, game_view, search,
+                    to_move)
+
+SEEDS = range(40)
+
+
+def play(seed, player) -> list:
+    """
+    Plays a game with player as the computer against Game.computer_move.
+
+    :return: the moves of the game
+    """
+    game = Game(random.Random(seed))
+    moves = []
+    while game.result() is None:
+        move = player(game) if game.turn == 'computer' \
+            else game.computer_move()
+        assert move in game.legal_moves()
+        moves.append(move)
+        game.play(move)
+    return moves
+
+
+def world_of(game) -> World:
+    """
+    :return: the World of a game, with the hidden pieces where they are
+    """
+    turn = SIDES.index(game.turn)
+    hands = [game.masks[side] for side in SIDES]
+    return World(hands, list(game.stock_pieces), game.board, game.left,
+                 game.right, list(game.played), turn)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_search_player_plays_legal_moves(seed):
+    play(seed, SearchPlayer(budget=None, iterations=50))
+
+
+def test_search_player_is_reproducible():
+    for seed in range(10):
+        assert play(seed, SearchPlayer(budget=None, iterations=50)) == \
+            play(seed, SearchPlayer(budget=None, iterations=50))
+
+
+def test_search_player_with_workers():
+    player = SearchPlayer(budget=None, iterations=30, workers=2)
+    try:
+        first = [play(seed, player) for seed in range(3)]
+        assert first == [play(seed, player) for seed in range(3)]
+    finally:
+        player.close()
+    assert player.pool is None
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_world_follows_game(seed):
+    game = Game(random.Random(seed))
+    while game.result() is None:
+        world = world_of(game)
+        actions = world.actions()
+        assert sorted(to_move(game, action) for action in actions) == \
+            sorted(game.legal_moves())
+        move = game.computer_move()
+        action = next(action for action in actions
+                      if to_move(game, action) == move)
+        game.play(move)
+        world.play(action)
+        assert world.hands == [game.masks[side] for side in SIDES]
+        assert (world.board, world.left, world.right) == \
+            (game.board, game.left, game.right)
+        assert world.played == game.played
+        assert SIDES[world.turn] == game.turn
+    result = world.result()
+    assert game.result() == ('draw' if result == DRAWN else SIDES[result])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rollout_ends_the_game(seed):
+    game = Game(random.Random(seed))
+    world = World.deal(game_view(game), random.Random(seed))
+    assert world.hands[world.turn] == game.masks[game.turn]
+    assert len(world.stock) == len(game.stock_pieces)
+    result = world.rollout(random.Random(seed))
+    assert result in (0, 1, DRAWN)
+    assert result == world.result()
+
+
+def test_key_separates_what_the_mover_knows():
+    game = Game(random.Random(0))
+    world = world_of(game)
+    key = world.key()
+    other = 1 - world.turn
+
+    # same hand, board and ends, only the stock or the other hand smaller
+    shorter = world_of(game)
+    shorter.stock.pop()
+    assert shorter.key() != key
+
+    drawn = world_of(game)
+    drawn.hands[other] |= 1 << drawn.stock.pop()
+    assert drawn.key() != key
+
+    fewer = world_of(game)
+    fewer.hands[other] &= fewer.hands[other] - 1
+    assert fewer.key() != key
+
+    moved = world_of(game)
+    moved.turn = other
+    assert moved.key() != world_of(game).key()
+
+    # the other hand's pieces don't matter, only how many there are
+    swapped = world_of(game)
+    low = swapped.hands[other] & -swapped.hands[other]
+    swapped.hands[other] ^= low | 1 << swapped.stock[0]
+    swapped.stock[0] = low.bit_length() - 1
+    assert swapped.key() == key
+
+
+def test_key_fields_do_not_overlap():
+    full = World([(1 << 28) - 1, (1 << 28) - 1], list(range(14)),
+                 (1 << 28) - 1, 6, 6, [0] * 7, 1)
+    key = full.key()
+    for field, width, shift in ((full.left, 3, 56), (full.right, 3, 59),
+                                (len(full.stock), 5, 62),
+                                (full.hands[0].bit_count(), 5, 67),
+                                (full.turn, 1, 72)):
+        assert key >> shift & (1 << width) - 1 == field
+
+
+def test_search_visits_only_legal_actions():
+    game = Game(random.Random(3))
+    stats = search(game_view(game), iterations=200, budget=None, seed=1)
+    assert {to_move(game, action) for action in stats} == \
+        set(game.legal_moves())
+    assert DRAW in stats
+    # every iteration starts at the root
+    assert sum(visits for visits, _ in stats.values()) == 200
+
+
+def test_search_needs_a_limit():
+    game = Game(random.Random(0))
+    with pytest.raises(ValueError):
+        search(game_view(game), iterations=None, budget=None)
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from loadgen import load, play_session
+from server import HOST, LINE_LIMIT, Session, serve
+
+RESULTS = ('player', 'computer', 'draw')
+
+
+def finish(session, seed) -> dict:
+    """
+    Plays the session's game to its end with random legal moves.
+
+    :return: the last state
+    """
+    rng = random.Random(seed)
+    state = session.handle('STATE')
+    while state['result'] is None:
+        state = session.handle(f"MOVE {rng.choice(state['moves'])}")
+        assert 'error' not in state
+    return state
+
+
+def test_commands_need_a_game():
+    session = Session()
+    for line in ('STATE', 'MOVE 1', 'state'):
+        assert session.handle(line) == {'error': 'no game, send NEW first'}
+
+
+def test_unknown_commands():
+    session = Session()
+    assert session.handle('PLAY 1') == {'error': "unknown command 'PLAY'"}
+    assert session.handle('') == {'error': "unknown command ''"}
+    assert session.handle('   \n') == {'error': "unknown command ''"}
+
+
+def test_new_needs_an_integer_seed():
+    session = Session()
+    assert session.handle('NEW seven') == {'error': 'seed must be an integer'}
+    assert session.game is None
+
+
+def test_new_deals_the_players_turn():
+    session = Session()
+    state = session.handle('new 12\n')
+    assert session.handle('STATE') == state
+    assert len(state['pieces']) + len(state['snake']) + state['stock'] \
+        + state['computer'] == 28
+    if state['result'] is None:
+        assert session.game.turn == 'player'
+        assert state['moves'] == session.game.legal_moves()
+    # the same seed deals the same game
+    assert Session().handle('NEW 12') == state
+
+
+@pytest.mark.parametrize('line', ['MOVE', 'MOVE one', 'MOVE 99',
+                                  'MOVE -99'])
+def test_illegal_moves_keep_the_game(line):
+    session = Session()
+    state = session.handle('NEW 3')
+    answer = session.handle(line)
+    assert answer == {'error': 'illegal move', **state}
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_games_end_and_refuse_more_moves(seed):
+    session = Session()
+    session.handle(f'NEW {seed}')
+    state = finish(session, seed)
+    assert state['result'] in RESULTS
+    assert state['moves'] == []
+    assert session.handle('MOVE 0') == {
+        'error': 'the game is over, send NEW for another'}
+    assert session.handle('STATE') == state
+    assert session.handle(f'NEW {seed + 1}')['snake']
+
+
+async def exchange(lines) -> list:
+    """
+    Sends lines to a server started on any free port.
+
+    :return: what the server answered, b'' once it closed the connection
+    """
+    started = asyncio.get_running_loop().create_future()
+    server = asyncio.create_task(serve(HOST, 0, started))
+    try:
+        reader, writer = await asyncio.open_connection(HOST, await started)
+        answers = []
+        for line in lines:
+            writer.write(line)
+            await writer.drain()
+            answers.append(await reader.readline())
+        writer.close()
+        return answers
+    finally:
+        server.cancel()
+
+
+def test_server_answers_every_line():
+    answers = asyncio.run(exchange([b'STATE\n', b'NEW 4\n', b'STATE\n']))
+    no_game, dealt, again = map(json.loads, answers)
+    assert no_game == {'error': 'no game, send NEW first'}
+    assert dealt == again
+
+
+def test_server_closes_on_long_lines():
+    answers = asyncio.run(exchange([b'NEW 4\n',
+                                    b'X' * (LINE_LIMIT + 1) + b'\n']))
+    assert json.loads(answers[0])['snake']
+    assert answers[1] == b''
+
+
+def test_sessions_finish_their_games():
+    async def run():
+        started = asyncio.get_running_loop().create_future()
+        server = asyncio.create_task(serve(HOST, 0, started))
+        port = await started
+        latencies, results = [], {}
+        try:
+            await asyncio.gather(
+                play_session(HOST, port, 3, 1, latencies, results),
+                play_session(HOST, port, 3, 2, latencies, results))
+        finally:
+            server.cancel()
+        return latencies, results
+
+    latencies, results = asyncio.run(run())
+    assert sum(results.values()) == 6
+    assert set(results) <= set(RESULTS)
+    assert latencies and all(seconds >= 0 for seconds in latencies)
+
+
+def test_load_starts_its_own_server():
+    report = asyncio.run(load(HOST, None, sessions=4, games=2, seed=5))
+    assert report['games'] == 8
+    assert set(report['results']) <= set(RESULTS)
+    assert report['moves'] > 0
+    assert list(report['percentiles']) == [50, 90, 99, 99.9]
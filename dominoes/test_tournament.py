@@ -0,0 +1,52 @@
+import pytest
+
+from tournament import (STRATEGIES, first_legal, frequency, load_strategy,
+                        random_legal, tournament, wilson_interval)
+
+
+def outcome(report) -> list:
+    return [report[name]['wins'] for name in ('first', 'second', 'draw')]
+
+
+def test_results_do_not_depend_on_workers_or_shards():
+    in_process = tournament(frequency, random_legal, 600, seed=4,
+                            shard_size=100)
+    pooled = tournament(frequency, random_legal, 600, seed=4, workers=3,
+                        shard_size=250)
+    assert outcome(in_process) == outcome(pooled) == [17, 24, 559]
+    assert in_process['turns'] == pooled['turns']
+    assert sum(worker['games']
+               for worker in pooled['workers'].values()) == 600
+
+
+def test_games_are_rounded_up_to_whole_deals():
+    report = tournament(first_legal, first_legal, 7, shard_size=3)
+    assert report['games'] == 8
+    # the same strategy in both seats wins each deal once or draws it twice
+    assert report['first']['wins'] == report['second']['wins']
+
+
+@pytest.mark.parametrize('shard_size', [0, -1])
+def test_shard_size_must_be_positive(shard_size):
+    with pytest.raises(ValueError, match='shard_size'):
+        tournament(frequency, random_legal, 10, shard_size=shard_size)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(0, 100)
+    assert low == pytest.approx(0.0)
+    assert 0.0 < high < 0.05
+    low, high = wilson_interval(100, 100)
+    assert 0.95 < low < 1.0
+    assert high == pytest.approx(1.0)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    low, high = wilson_interval(50, 100)
+    assert low == pytest.approx(1 - high)
+    assert low < 0.5 < high
+
+
+def test_load_strategy():
+    assert load_strategy('random') is STRATEGIES['random']
+    assert load_strategy('tournament:first_legal') is first_legal
+    with pytest.raises(ValueError, match='unknown strategy'):
+        load_strategy('best')
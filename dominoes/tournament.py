@@ -0,0 +1,226 @@
+import argparse
+import importlib
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dominoes import game_seed, play_game
+from endgame import EndgamePlayer
+from search import SearchPlayer
+
+SHARD_SIZE = 1000
+Z_95 = 1.959964
+
+
+def frequency(game) -> int:
+    """
+    The computer logic of the console game, playing the piece whose numbers
+    are most common in its hand and on the board.
+    """
+    return game.computer_move()
+
+
+def first_legal(game) -> int:
+    """
+    Plays the first piece in hand that fits, drawing when none does.
+    """
+    return game.legal_moves()[0]
+
+
+def random_legal(game) -> int:
+    """
+    Picks any legal move, drawing included, with the game's own random
+    generator so games stay reproducible.
+    """
+    return game.rng.choice(game.legal_moves())
+
+
+STRATEGIES = {
+    'frequency': frequency,
+    'first': first_legal,
+    'random': random_legal,
+    'search': SearchPlayer(iterations=200, budget=None),
+    'endgame': EndgamePlayer(),
+}
+
+
+def load_strategy(name):
+    """
+    :param name: a name from STRATEGIES, or module:function for a strategy
+    defined elsewhere, which must be importable by the worker processes
+    :return: the strategy callable, taking a Game and returning a move
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, sep, function = name.partition(':')
+    if not sep:
+        raise ValueError(f'unknown strategy {name!r}, expected one of '
+                         f'{", ".join(STRATEGIES)} or module:function')
+    return getattr(importlib.import_module(module), function)
+
+
+def play_shard(first, second, seed, begin, end) -> dict:
+    """
+    Plays games number begin to end - 1 of a tournament.
+
+    Every deal is played twice with the seats swapped, so neither strategy
+    profits from being dealt better hands or from moving first more often:
+    even games put first in the player's seat, odd games in the computer's.
+
+    :param first: the first strategy
+    :param second: the second strategy
+    :param seed: seed of the tournament
+    :param begin: number of the first game of the shard
+    :param end: one past the number of the last game of the shard
+    :return: wins of each strategy, draws, turns and timing of the shard
+    """
+    results = {'first': 0, 'second': 0, 'draw': 0}
+    turns = 0
+    started = time.perf_counter()
+    for number in range(begin, end):
+        if number % 2 == 0:
+            seats = {'player': 'first', 'computer': 'second'}
+        else:
+            seats = {'player': 'second', 'computer': 'first'}
+        strategies = {side: first if name == 'first' else second
+                      for side, name in seats.items()}
+        game = play_game(random.Random(game_seed(seed, number // 2)),
+                         strategies)
+        result = game.result()
+        results[seats.get(result, result)] += 1
+        turns += game.turns
+    return {**results, 'turns': turns,
+            'seconds': time.perf_counter() - started, 'worker': os.getpid()}
+
+
+def wilson_interval(wins, games, z=Z_95) -> tuple:
+    """
+    The Wilson score interval of a win rate, which unlike the normal
+    approximation stays inside [0, 1] for rates near 0 or 1.
+
+    :param wins: number of games won
+    :param games: number of games played
+    :param z: the standard normal quantile of the confidence level
+    :return: the lower and upper bound of the rate
+    """
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    centre = rate + z * z / (2 * games)
+    spread = z * math.sqrt(rate * (1 - rate) / games
+                           + z * z / (4 * games * games))
+    scale = 1 + z * z / games
+    return (centre - spread) / scale, (centre + spread) / scale
+
+
+def tournament(first, second, games, seed=0, workers=None,
+               shard_size=SHARD_SIZE) -> dict:
+    """
+    Plays two strategies against each other and compares their win rates.
+
+    Games are split into shards of consecutive game numbers and played in a
+    process pool. Every game's deal depends only on the seed and its number,
+    so the results don't depend on the number of workers or on the shard
+    size.
+
+    :param first: the first strategy, a callable taking a Game and returning
+    a move, defined at module level so worker processes can import it
+    :param second: the second strategy
+    :param games: number of games to play, rounded up to an even number so
+    each deal is played from both seats
+    :param seed: seed of the tournament
+    :param workers: number of worker processes, None or 1 plays in this
+    process
+    :param shard_size: number of games sent to a worker at once
+    :raises ValueError: if shard_size is less than 1
+    :return: wins, rates and confidence intervals of both strategies, draws,
+    and throughput in total and per worker
+    """
+    if shard_size < 1:
+        raise ValueError(f'shard_size must be at least 1, got {shard_size}')
+    games += games % 2
+    shard_size += shard_size % 2
+    shards = [(begin, min(begin + shard_size, games))
+              for begin in range(0, games, shard_size)]
+    started = time.perf_counter()
+    if not workers or workers < 2:
+        parts = [play_shard(first, second, seed, begin, end)
+                 for begin, end in shards]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play_shard, first, second, seed, begin, end)
+                       for begin, end in shards]
+            parts = [future.result() for future in futures]
+    seconds = time.perf_counter() - started
+
+    report = {'games': games, 'seconds': seconds,
+              'games_per_second': games / seconds if seconds else 0.0,
+              'turns': sum(part['turns'] for part in parts)}
+    for name in ('first', 'second', 'draw'):
+        wins = sum(part[name] for part in parts)
+        report[name] = {'wins': wins, 'rate': wins / games,
+                        'interval': wilson_interval(wins, games)}
+
+    workers = {}
+    for part in parts:
+        worker = workers.setdefault(part['worker'],
+                                    {'games': 0, 'seconds': 0.0})
+        worker['games'] += part['first'] + part['second'] + part['draw']
+        worker['seconds'] += part['seconds']
+    for worker in workers.values():
+        worker['games_per_second'] = (worker['games'] / worker['seconds']
+                                      if worker['seconds'] else 0.0)
+    report['workers'] = workers
+    return report
+
+
+def show_tournament(report, first_name, second_name) -> str:
+    """
+    :param report: the result of tournament()
+    :param first_name: name to show for the first strategy
+    :param second_name: name to show for the second strategy
+    :return: a readable summary
+    """
+    lines = [f"Games: {report['games']} in {report['seconds']:.2f}s "
+             f"({report['games_per_second']:.0f} games/s)"]
+    for key, name in (('first', first_name), ('second', second_name),
+                      ('draw', 'draws')):
+        low, high = report[key]['interval']
+        lines.append(f"{name}: {report[key]['wins']} "
+                     f"({report[key]['rate']:.2%}, 95% CI "
+                     f"{low:.2%} to {high:.2%})")
+    lines.append(f"Average turns: {report['turns'] / report['games']:.1f}")
+    for pid, worker in sorted(report['workers'].items()):
+        lines.append(f"Worker {pid}: {worker['games']} games, "
+                     f"{worker['games_per_second']:.0f} games/s")
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play two dominoes '
+                                                 'strategies against each '
+                                                 'other.')
+    parser.add_argument('first', nargs='?', default='frequency',
+                        help='strategy name or module:function')
+    parser.add_argument('second', nargs='?', default='random',
+                        help='strategy name or module:function')
+    parser.add_argument('-g', '--games', type=int, default=10_000,
+                        help='number of games to play')
+    parser.add_argument('-s', '--seed', type=int, default=0,
+                        help='seed of the tournament')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE,
+                        help='number of games sent to a worker at once')
+    args = parser.parse_args()
+    if args.shard_size < 1:
+        parser.error('--shard-size must be at least 1')
+    report = tournament(load_strategy(args.first), load_strategy(args.second),
+                        args.games, args.seed, args.jobs, args.shard_size)
+    print(show_tournament(report, args.first, args.second))
+
+
+if __name__ == '__main__':
+    main()
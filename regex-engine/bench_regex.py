@@ -0,0 +1,193 @@
+"""
+Benchmarks for the regex engine.
+Module Name: Regex Engine Benchmarks
+
+Description:
+Times the engine on short and long subjects, wildcards, quantifier chains,
+anchors and pathological patterns, next to the same match done by the stdlib
+re module. Run it directly: python bench_regex.py [--json results.json]
+The JSON output is meant to be kept and diffed between versions.
+"""
+import argparse
+import json
+import math
+import platform
+import re
+import timeit
+
+from regex import compare_strings, compile, tokenize
+
+REPEAT = 3
+SIZES = [10_000, 50_000, 100_000]
+PATHOLOGICAL_SIZES = [8, 16, 32, 64, 128]
+LONG = "abcdefghij " * 10_000
+# has none of the letters the wildcard and quantifier cases start with, so
+# their hit is at the end of the subject rather than in the first few characters
+FILLER = "klmnopqrst " * 10_000
+
+# (group, name, regex, string)
+CASES = [
+    ("literal", "short hit", "apple", "tasty apple"),
+    ("literal", "short miss", "peach", "tasty apple"),
+    ("literal", "long hit at end", "needle", LONG + "needle"),
+    ("literal", "long miss", "needle", LONG),
+    ("wildcard", "dots", "a.c.e", FILLER + "abcde"),
+    ("wildcard", "dot star between literals", "error.*timeout", FILLER + "error timeout"),
+    ("wildcard", "dot star miss", "error.*timeout", FILLER + "error"),
+    ("quantifier", "question chain", "colou?r?s?", "the colours"),
+    ("quantifier", "star chain", "a*b*c*d", FILLER + "d"),
+    ("quantifier", "plus chain", "a+b+c+", FILLER + "abc"),
+    ("anchor", "start hit", "^abc", LONG),
+    ("anchor", "start miss", "^xyz", LONG),
+    ("anchor", "end hit", "hij $", LONG),
+    ("anchor", "end miss", "xyz$", LONG),
+    ("anchor", "both", "^a.*j $", LONG),
+    ("pathological", "a?{18}a{18}", "a?" * 18 + "a" * 18, "a" * 18),
+    ("pathological", ".*{4}x", ".*" * 4 + "x", "a" * 60),
+]
+
+
+def to_re(regex):
+    """
+    The stdlib equivalent of is_match(regex, ...): the bound re.fullmatch or
+    re.search of a compiled re pattern.
+    """
+    tokens, anchor_start, anchor_end = tokenize(regex)
+    body = "".join(
+        ("." if char is None else re.escape(char)) + quantifier
+        for char, quantifier in tokens
+    )
+    if anchor_start and anchor_end:
+        return re.compile(body, re.DOTALL).fullmatch
+    body = ("^" if anchor_start else "") + body + ("$" if anchor_end else "")
+    return re.compile(body, re.DOTALL).search
+
+
+def sliced_search(regex, string):
+    """The old unanchored loop, copies the rest of the string for every start position."""
+    while string:
+        if compare_strings(regex, string):
+            return True
+        string = string[1:]
+    return False
+
+
+def cursor_search(regex, string):
+    """The same loop walking a start cursor over the original string."""
+    return any(compare_strings(regex, string, 0, s) for s in range(len(string)))
+
+
+def time_call(func, *args):
+    """Best time in seconds of one func(*args) call."""
+    timer = timeit.Timer(lambda: func(*args))
+    loops, _ = timer.autorange()
+    return min(timer.repeat(REPEAT, loops)) / loops
+
+
+def bench_cases():
+    """Times every case against re, checking both give the same answer."""
+    results = []
+    for group, name, regex, string in CASES:
+        pattern = compile(regex)
+        re_match = to_re(regex)
+        result = pattern.match(string)
+        if result is not (re_match(string) is not None):
+            raise AssertionError(f"{regex!r} disagrees with re on {name!r}")
+        seconds = time_call(pattern.match, string)
+        re_seconds = time_call(re_match, string)
+        results.append(
+            {
+                "group": group,
+                "name": name,
+                "regex": regex,
+                "length": len(string),
+                "result": result,
+                "seconds": seconds,
+                "re_seconds": re_seconds,
+                "ratio": seconds / re_seconds,
+            }
+        )
+    return results
+
+
+def bench_slicing():
+    """Compares slicing against cursors on an unanchored search with a late match."""
+    results = []
+    for size in SIZES:
+        string = "a" * size + "needle"
+        results.append(
+            {
+                "length": size,
+                "sliced_seconds": time_call(sliced_search, "ne+dle", string),
+                "cursor_seconds": time_call(cursor_search, "ne+dle", string),
+            }
+        )
+    return results
+
+
+def bench_pathological():
+    """
+    Times patterns that take exponential time without memoization. With every
+    (regex, string) cursor pair tried once, doubling n multiplies the time by
+    a bounded factor, so the growth exponent stays flat instead of climbing.
+    """
+    cases = [
+        ("a?{n}a{n}", lambda n: ("a?" * n + "a" * n, "a" * n)),
+        (".*{4}x", lambda n: (".*" * 4 + "x", "a" * n)),
+    ]
+    results = []
+    for name, build in cases:
+        previous = None
+        for n in PATHOLOGICAL_SIZES:
+            seconds = time_call(compare_strings, *build(n))
+            exponent = math.log2(seconds / previous) if previous else 0.0
+            results.append(
+                {"name": name, "n": n, "seconds": seconds, "exponent": exponent}
+            )
+            previous = seconds
+    return results
+
+
+def print_report(report):
+    """Prints the benchmark results as tables."""
+    print(f"{'case':<40} {'length':>7} {'engine us':>10} {'re us':>10} {'ratio':>8}")
+    for row in report["cases"]:
+        name = f"{row['group']}: {row['name']}"
+        print(
+            f"{name:<40} {row['length']:>7} {row['seconds'] * 1e6:>10.2f} "
+            f"{row['re_seconds'] * 1e6:>10.2f} {row['ratio']:>7.1f}x"
+        )
+
+    print("\nunanchored backtracking search, match at the end of the string")
+    print(f"{'size':>10} {'sliced':>10} {'cursor':>10} {'speedup':>8}")
+    for row in report["slicing"]:
+        sliced, cursor = row["sliced_seconds"], row["cursor_seconds"]
+        speedup = sliced / cursor
+        print(f"{row['length']:>10} {sliced:>10.4f} {cursor:>10.4f} {speedup:>7.1f}x")
+
+    print("\npathological backtracking against a string of length n")
+    print(f"{'case':<12} {'n':>6} {'seconds':>10} {'exponent':>8}")
+    for row in report["pathological"]:
+        name, seconds, exponent = row["name"], row["seconds"], row["exponent"]
+        print(f"{name:<12} {row['n']:>6} {seconds:>10.4f} {exponent:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the regex engine.")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "cases": bench_cases(),
+        "slicing": bench_slicing(),
+        "pathological": bench_pathological(),
+    }
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
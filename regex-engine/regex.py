@@ -6,124 +6,1218 @@ Created: 17 Oct 24
 
 Description:
 This project has you build a basic regex engine to understand how regex expressions work.
-I used a recursive approach for most of the project.
+compare_strings() is a backtracking matcher that keeps the choices still to
+try on an explicit stack instead of recursing.
+
+Patterns can also be compiled once with compile(). A compiled Pattern keeps the
+regex as a bit-parallel NFA (one bit per token) so matching is a single linear
+pass over the string, and is_match() reuses compiled patterns through a cache.
 """
+import argparse
+import codecs
+import copy
+import functools
+import itertools
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 
+QUANTIFIERS = ["?", "*", "+"]
+CACHE_SIZE = 512
+CHUNK_SIZE = 1000
+CHUNKS_PER_WORKER = 4
+DFA_CAPACITY = 10_000
+DFA_THRASH_STEPS = 10
+FILE_MAGIC = b"RXE1"
+FILE_HEADER = "<4sI"  # magic, number of patterns
+INDEX_ENTRY = "<QI"  # offset and length of one packed pattern
+PATTERN_HEADER = "<IIIBiI"  # regex, literal and state lengths, anchors, lead, characters
 
-def parse_question(regex, string):
-    """checks for optional character, strips regex or both"""
-    if regex[0] in [string[0], "."]:
-        return compare_strings(regex[2:], string[1:])
-    return compare_strings(regex[2:], string)
+profiler = None  # the Profiler collecting is_match() counters while instrumentation is on
 
 
-def parse_asterisk(regex, string):
-    """
-    Regular expression pattern * for zero or more of preceding character.
-    """
-    if string and regex[0] in [string[0], "."]:
-        return parse_asterisk(regex, string[1:])
-    # if we eat the entire string because of "." wildcard
-    if not string:
-        return True
-    return compare_strings(regex[2:], string)
+def atom_width(regex, r):
+    """Length of the atom at regex[r], 2 for an escaped character."""
+    return 2 if regex[r] == "\\" and r + 1 < len(regex) else 1
 
 
-def parse_plus(regex, string):
-    """validates at least one instance of character, then parses as asterisk"""
-    if regex[0] not in [string[0], "."]:
+def match_atom(regex, string, r, s):
+    """Indicates if string[s] matches the atom at regex[r]."""
+    if s >= len(string):
         return False
-    regex = regex[:1] + "*" + regex[2:]
-    return parse_asterisk(regex, string)
+    if atom_width(regex, r) == 2:
+        return regex[r + 1] == string[s]
+    return regex[r] in [string[s], "."]
+
+
+def is_match(regex, string):
+    """Determines front, back, or general regex vs string match"""
+    if profiler is not None:
+        return profiler.run(regex, string)
+    return compile(regex).match(string)
 
 
-def compare_character(regex, string, period_literal=False):
-    """Indicates if the first character of the string matches the given regular expression."""
-    if period_literal:
-        if regex[0] in [string[0]]:
-            return compare_strings(regex[1:], string[1:])
-    elif regex[0] in [string[0], "."]:
-        return compare_strings(regex[1:], string[1:])
+def compare_strings(regex, string, r=0, s=0):
+    """
+    Matches regular expression against a string factoring wildcards.
+    r and s are cursors into regex and string, so nothing is sliced or copied.
+    Choices still to try are kept on an explicit stack instead of recursing,
+    so the call stack stays flat however long the string is. Every (r, s) pair
+    is tried at most once, because a pair seen again already failed.
+    """
+    stack = [(r, s)]
+    tried = set()
+    while stack:
+        r, s = stack.pop()
+        while r < len(regex):
+            if (r, s) in tried:
+                break
+            tried.add((r, s))
+            width = atom_width(regex, r)
+            quantifier = regex[r + width : r + width + 1]
+            if quantifier not in QUANTIFIERS:
+                quantifier = ""
+            rest = r + width + len(quantifier)
+
+            if quantifier in ["*", "+"]:
+                first = s + 1 if quantifier == "+" else s
+                end = s
+                while match_atom(regex, string, r, end):
+                    end += 1
+                if end < first:
+                    break
+                # try the longest run first, shorter runs are popped later
+                stack.extend((rest, i) for i in range(first, end))
+                r, s = rest, end
+            elif quantifier == "?":
+                if match_atom(regex, string, r, s):
+                    stack.append((rest, s))
+                    s += 1
+                r = rest
+            elif match_atom(regex, string, r, s):
+                r, s = rest, s + 1
+            else:
+                break
+        else:
+            return True
     return False
 
 
-def is_match(regex, string):
-    """Determines front, back, or general regex vs string match"""
-    is_front_match = True
-    is_back_match = True
+def tokenize(regex):
+    """
+    Splits a regex into (character, quantifier) tokens.
 
-    # empty values edge case
-    if not regex:
-        return True
-    if not string:
-        return False
+    A character of None is the "." wildcard and "+" is expanded to the character
+    followed by the same character with "*". A leading ^ and a trailing $ are
+    returned as anchor flags, any other unescaped ^ or $ is stripped.
+    """
+    anchor_start = regex[:1] == "^"
+    anchor_end = False
+    atoms = []  # (character, escaped)
+    i = 1 if anchor_start else 0
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\":
+            i += 1
+            # a trailing backslash has nothing to escape and stays a literal
+            atoms.append((regex[i] if i < len(regex) else "\\", True))
+        elif char in ["^", "$"]:
+            anchor_end = char == "$" and i == len(regex) - 1
+        else:
+            atoms.append((char, False))
+        i += 1
 
-    # note: project test cases don't account for ^ and $ meta characters as literals so they are stripped
-    if regex[0] == "^":
-        regex1 = regex.replace("^", "").replace("$", "")
-        string1 = string
-        is_front_match = compare_strings(regex1, string1)
-    if regex[-1] == "$":
-        regex2 = reverse_regex(regex.replace("^", "").replace("$", ""))
-        is_back_match = compare_strings(regex2, string[::-1])
+    tokens = []
+    i = 0
+    while i < len(atoms):
+        char, escaped = atoms[i]
+        if not escaped and char == ".":
+            char = None
+        quantifier = ""
+        if i + 1 < len(atoms) and not atoms[i + 1][1] and atoms[i + 1][0] in QUANTIFIERS:
+            quantifier = atoms[i + 1][0]
+            i += 1
+        if quantifier == "+":
+            tokens.append((char, ""))
+            quantifier = "*"
+        tokens.append((char, quantifier))
+        i += 1
+    return tokens, anchor_start, anchor_end
 
-    if not is_front_match or not is_back_match:
-        return False
 
-    # general string vs regex matching
-    regex = regex.replace("^", "").replace("$", "")
-    matching = False
-
-    while string and not matching:
-        matching = compare_strings(regex, string)
-        string = string[1:]
-    return matching
-
-
-def reverse_regex(regex):
-    """Reverses order of regex input preserving wildcards for $ comparison."""
-    reversed_regex = ""
-    held_char = ""
-    for char in regex[::-1]:
-        if char in ["*", "+", "?", "\\"] and held_char != "\\":
-            held_char = char
-        elif held_char:
-            reversed_regex += char + held_char
-            held_char = ""
+def required_literal(tokens):
+    """
+    Finds a run of plain characters that every match has to contain.
+
+    Runs with a bounded number of characters in front of them are preferred,
+    since only those tell where a match can start, then longer runs.
+
+    :param tokens: tokens from tokenize()
+    :return: the literal and the most characters a match can have before it,
+    None when a "*" in front makes that unbounded
+    """
+    best, best_lead = "", None
+    run, run_lead = "", None
+    lead = 0
+    for char, quantifier in tokens + [(None, "")]:  # the sentinel ends the last run
+        if char is not None and not quantifier:
+            if not run:
+                run_lead = lead
+            run += char
         else:
-            reversed_regex += char
-    return reversed_regex
+            key = (run_lead is not None, len(run))
+            if run and key > (best_lead is not None, len(best)):
+                best, best_lead = run, run_lead
+            run = ""
+        if lead is not None:
+            lead = None if quantifier == "*" else lead + 1
+    return best, best_lead
+
 
+class NFA:
+    """
+    A bit-parallel NFA built from regex tokens.
+
+    Each token is one bit of a state set, followed by one accept bit after the
+    last token of each regex: a set bit means the tokens before it have been
+    matched. Stepping every active state over a character is a handful of
+    integer operations, however many states there are.
+    """
 
-def compare_strings(regex, string):
-    """Matches regular expression against a string factoring wildcards."""
-    if not regex:
-        return True
+    size: int
+    literals: dict
+    wildcards: int
+    loops: int
+    optional: int
 
-    # factors espcape character
-    if regex[0] == "\\":
-        regex = regex[1:]
-        if regex[0] == ".":
-            return compare_character(regex, string, True)
-        return compare_character(regex, string)
+    def __init__(self) -> None:
+        self.size = 0  # bits used so far
+        self.literals = {}  # character -> tokens matching that character
+        self.wildcards = 0  # "." tokens match every character
+        self.loops = 0  # "*" tokens stay in place after matching
+        self.optional = 0  # "?" and "*" tokens can be skipped
 
-    if len(regex) > 1:
-        match regex[1]:
-            case "?":
-                return parse_question(regex, string)
-            case "*":
-                return parse_asterisk(regex, string)
-            case "+":
-                return parse_plus(regex, string)
-    return compare_character(regex, string)
+    def add(self, tokens) -> int:
+        """
+        Appends tokens as a chain of states followed by their accept state.
+
+        :param tokens: tokens from tokenize()
+        :return: the bit index of the first state, the accept state is at
+        that index + len(tokens)
+        """
+        first = self.size
+        for i, (char, quantifier) in enumerate(tokens, first):
+            bit = 1 << i
+            if char is None:
+                self.wildcards |= bit
+            else:
+                self.literals[char] = self.literals.get(char, 0) | bit
+            if quantifier == "*":
+                self.loops |= bit
+            if quantifier:
+                self.optional |= bit
+        self.size += len(tokens) + 1
+        return first
+
+    def closure(self, states) -> int:
+        """
+        Adds every state reachable by skipping optional tokens.
+
+        Adding the active optional bits to the optional mask carries through
+        each run of optional tokens, so the xor marks every state after them.
+        """
+        return states | ((self.optional + (states & self.optional)) ^ self.optional)
+
+    def step(self, states, char) -> int:
+        """Advances the active states over one character."""
+        matched = states & (self.wildcards | self.literals.get(char, 0))
+        return self.closure(((matched & ~self.loops) << 1) | (matched & self.loops))
+
+
+class Pattern(NFA):
+    """A compiled regex, matched in one linear pass over the string."""
+
+    regex: str
+    anchor_start: bool
+    anchor_end: bool
+    accept: int
+    start: int
+    literal: str
+    lead: int | None
+    reverse: NFA
+    reverse_start: int
+
+    def __init__(self, regex) -> None:
+        """
+        Compiles the regex into its NFA masks.
+
+        :param regex: the regex to compile
+        """
+        super().__init__()
+        self.regex = regex
+        tokens, self.anchor_start, self.anchor_end = tokenize(regex)
+        self.add(tokens)
+        self.accept = 1 << len(tokens)
+        self.start = self.closure(1)
+        self.literal, self.lead = required_literal(tokens)
+        # the same tokens back to front, for matching $ regexes from the end
+        self.reverse = NFA()
+        self.reverse.add(tokens[::-1])
+        self.reverse_start = self.reverse.closure(1)
+
+    def __repr__(self) -> str:
+        return f"Pattern({self.regex!r})"
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the compiled tables into bytes for from_bytes(): a fixed header,
+        the regex and required literal, the literal characters as little-endian
+        code points, then every mask as little-endian bytes of one fixed width.
+        """
+        regex = self.regex.encode()
+        literal = self.literal.encode()
+        chars = sorted(self.literals)
+        anchors = self.anchor_start | self.anchor_end << 1
+        lead = -1 if self.lead is None else self.lead
+        forward, reverse = self, self.reverse
+        masks = [
+            forward.wildcards,
+            forward.loops,
+            forward.optional,
+            self.start,
+            reverse.wildcards,
+            reverse.loops,
+            reverse.optional,
+            self.reverse_start,
+        ]
+        masks += [forward.literals[char] for char in chars]
+        masks += [reverse.literals[char] for char in chars]
+        width = (self.size + 7) // 8
+        return b"".join(
+            [
+                struct.pack(
+                    PATTERN_HEADER,
+                    len(regex),
+                    len(literal),
+                    self.size,
+                    anchors,
+                    lead,
+                    len(chars),
+                ),
+                regex,
+                literal,
+                struct.pack(f"<{len(chars)}I", *map(ord, chars)),
+                *(mask.to_bytes(width, "little") for mask in masks),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, buffer, offset=0):
+        """
+        Rebuilds a pattern from to_bytes() output without tokenizing the regex.
+
+        :param buffer: bytes or a memory-mapped file holding the packed pattern
+        :param offset: where the packed pattern starts in buffer
+        :return: an instance of the class it is called on
+        """
+        regex_length, literal_length, size, anchors, lead, count = struct.unpack_from(
+            PATTERN_HEADER, buffer, offset
+        )
+        offset += struct.calcsize(PATTERN_HEADER)
+        regex = bytes(buffer[offset : offset + regex_length]).decode()
+        offset += regex_length
+        literal = bytes(buffer[offset : offset + literal_length]).decode()
+        offset += literal_length
+        chars = [chr(code) for code in struct.unpack_from(f"<{count}I", buffer, offset)]
+        offset += 4 * count
+
+        width = (size + 7) // 8
+        masks = []
+        for _ in range(8 + 2 * count):
+            masks.append(int.from_bytes(buffer[offset : offset + width], "little"))
+            offset += width
+
+        pattern = cls.__new__(cls)
+        pattern.reverse = NFA()
+        for nfa, first in [(pattern, 0), (pattern.reverse, 4)]:
+            nfa.size = size
+            nfa.wildcards, nfa.loops, nfa.optional = masks[first : first + 3]
+        pattern.literals = dict(zip(chars, masks[8 : 8 + count]))
+        pattern.reverse.literals = dict(zip(chars, masks[8 + count :]))
+        pattern.regex = regex
+        pattern.anchor_start = bool(anchors & 1)
+        pattern.anchor_end = bool(anchors & 2)
+        pattern.accept = 1 << (size - 1)
+        pattern.start = masks[3]
+        pattern.reverse_start = masks[7]
+        pattern.literal = literal
+        pattern.lead = None if lead < 0 else lead
+        return pattern
+
+    def match(self, string) -> bool:
+        """
+        Same result as is_match(self.regex, string).
+
+        A $ regex without ^ is stepped backwards from the end of the string
+        through the reversed NFA, so it stops as soon as the suffix can no
+        longer match.
+
+        Without either anchor a match can start anywhere, and the string
+        matches if earliest_end() finds the end of a match.
+        """
+        # the project tests expect an empty regex to match anything and an
+        # empty string to fail every other regex
+        if not self.regex:
+            return True
+        if not string:
+            return False
+
+        accept, start = self.accept, self.start
+        step = self.step
+        states = start
+        if self.anchor_start:
+            anchor_end = self.anchor_end
+            for char in string:
+                if states & accept and not anchor_end:
+                    return True
+                states = step(states, char)
+                if not states:
+                    return False
+            return bool(states & accept)
+
+        if self.anchor_end:
+            step = self.reverse.step
+            states = self.reverse_start
+            for char in reversed(string):
+                if states & accept:
+                    return True
+                states = step(states, char)
+                if not states:
+                    return False
+            return bool(states & accept)
+
+        return self.earliest_end(string, 0) is not None
+
+    def matcher(self):
+        """A Matcher for feeding this pattern a string in chunks."""
+        return Matcher(self)
+
+    def search(self, string, pos=0):
+        """
+        Finds the leftmost match starting at or after pos, and the longest
+        match from that start. Unlike is_match, an empty string or an empty
+        match follows the usual regex rules.
+
+        The forward NFA finds where the first match ends, the reverse NFA
+        walks back from there to the leftmost start, and a forward run from
+        that start finds the longest end.
+
+        :param string: the string to search
+        :param pos: index to start searching from
+        :return: (start, end) of the match or None
+        """
+        if self.anchor_start:
+            start = None if pos else 0
+        elif self.anchor_end:
+            start = self.leftmost_start(string, len(string), pos)
+        else:
+            end = self.earliest_end(string, pos)
+            start = None if end is None else self.leftmost_start(string, end, pos)
+        if start is None:
+            return None
+        end = self.longest_end(string, start)
+        return None if end is None else (start, end)
+
+    def finditer(self, string):
+        """
+        Yields the (start, end) span of every non-overlapping match, left to
+        right. An empty match moves the search on by one character.
+        """
+        pos = 0
+        while pos <= len(string):
+            span = self.search(string, pos)
+            if span is None:
+                return
+            yield span
+            start, end = span
+            pos = end if end > start else end + 1
+
+    def earliest_end(self, string, pos):
+        """
+        Runs the unanchored forward NFA from pos and returns the first index
+        where any match ends, or None.
+
+        Whenever no match is in progress, str.find jumps ahead to the next
+        place the required literal can start a match, and a string without the
+        literal is rejected before any character is stepped.
+        """
+        accept, start = self.accept, self.start
+        step = self.step
+        literal, lead = self.literal, self.lead
+        if literal and lead is None and string.find(literal, pos) < 0:
+            return None
+        if lead is None:
+            literal = ""
+        states = start
+        hit = -1
+        i = pos
+        while i < len(string):
+            if states & accept:
+                return i
+            if literal and states == start:
+                if hit < i:
+                    hit = string.find(literal, i)
+                    if hit < 0:
+                        return None
+                i = max(i, hit - lead)
+            states = step(states, string[i]) | start
+            i += 1
+        return i if states & accept else None
+
+    def leftmost_start(self, string, end, pos):
+        """Smallest start at or after pos of a match ending at end, or None."""
+        accept = self.accept
+        step = self.reverse.step
+        states = self.reverse_start
+        start = end if states & accept else None
+        for i in range(end - 1, pos - 1, -1):
+            states = step(states, string[i])
+            if not states:
+                break
+            if states & accept:
+                start = i
+        return start
+
+    def longest_end(self, string, start):
+        """End of the longest match starting at start, or None."""
+        accept = self.accept
+        step = self.step
+        states = self.start
+        end = start if states & accept else None
+        for i in range(start, len(string)):
+            states = step(states, string[i])
+            if not states:
+                break
+            if states & accept:
+                end = i + 1
+        if self.anchor_end and end != len(string):
+            return None
+        return end
+
+
+class Matcher:
+    """
+    Matches a Pattern against a string that arrives in chunks.
+
+    Only the NFA state set is carried from one chunk to the next, so memory
+    stays the same however long the string is. The result is the same as
+    is_match() on all the chunks joined together.
+    """
+
+    pattern: Pattern
+    states: int
+    matched: bool
+    empty: bool
+
+    def __init__(self, pattern) -> None:
+        """
+        Starts a match at the beginning of the string.
+
+        :param pattern: the compiled Pattern to match
+        """
+        self.pattern = pattern
+        self.states = pattern.start
+        self.matched = not pattern.regex  # the empty regex matches anything
+        self.empty = True  # no characters fed yet
+
+    def feed(self, chunk) -> bool:
+        """
+        Steps the pattern over the next chunk of the string.
+
+        :param chunk: the next part of the string
+        :return: True once the string is known to match whatever comes next
+        """
+        if self.matched or not chunk:
+            return self.matched
+        self.empty = False
+        pattern = self.pattern
+        accept, start = pattern.accept, pattern.start
+        anchor_start, anchor_end = pattern.anchor_start, pattern.anchor_end
+        step = pattern.step
+        states = self.states
+        for char in chunk:
+            if not states:
+                break
+            if states & accept and not anchor_end:
+                self.matched = True
+                break
+            states = step(states, char)
+            if not anchor_start:
+                states |= start
+        self.states = states
+        self.matched = self.matched or bool(states & accept and not anchor_end)
+        return self.matched
+
+    def finish(self) -> bool:
+        """Same result as is_match(regex, every chunk fed so far joined)."""
+        if self.matched:
+            return True
+        return not self.empty and bool(self.states & self.pattern.accept)
+
+
+async def match_stream(regex, reader, chunk_size=CHUNK_SIZE * 64, encoding="utf-8"):
+    """
+    Matches regex against everything read from an asyncio.StreamReader.
+
+    Bytes are decoded and fed to a Matcher one read at a time, and reading
+    stops as soon as the result is known, so memory doesn't grow with the
+    length of the stream.
+
+    :param regex: the regex to match
+    :param reader: an asyncio.StreamReader
+    :param chunk_size: most bytes read at a time
+    :param encoding: text encoding of the stream
+    :return: the same result as is_match() on the whole decoded stream
+    """
+    matcher = compile(regex).matcher()
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while chunk := await reader.read(chunk_size):
+        if matcher.feed(decoder.decode(chunk)):
+            return True
+    matcher.feed(decoder.decode(b"", final=True))
+    return matcher.finish()
+
+
+class RegexSet(NFA):
+    """
+    Many regexes merged into one NFA.
+
+    Every regex gets its own range of state bits, so a single pass over a
+    string steps all of them at once and the per-character cost barely grows
+    with the number of regexes. A regex that has matched is dropped from the
+    rest of the pass.
+    """
+
+    regexes: list
+    ranges: list
+    accepts: dict
+    start: int
+    start_anchored: int
+    accept_any: int
+    accept_end: int
+
+    def __init__(self, regexes) -> None:
+        """
+        Compiles every regex into the shared NFA.
+
+        :param regexes: an iterable of regexes
+        """
+        super().__init__()
+        self.regexes = list(regexes)
+        self.ranges = []  # state bits of each regex
+        self.accepts = {}  # accept bit -> regex index
+        self.start = 0  # start states entered at every position
+        self.start_anchored = 0  # start states of ^ regexes, position 0 only
+        self.accept_any = 0  # accept states that can match anywhere
+        self.accept_end = 0  # accept states of $ regexes, end of string only
+        for index, regex in enumerate(self.regexes):
+            tokens, anchor_start, anchor_end = tokenize(regex)
+            first = self.add(tokens)
+            accept = 1 << (first + len(tokens))
+            start = self.closure(1 << first)
+            self.ranges.append((accept << 1) - (1 << first))
+            self.accepts[accept] = index
+            if anchor_start:
+                self.start_anchored |= start
+            else:
+                self.start |= start
+            if anchor_end:
+                self.accept_end |= accept
+            else:
+                self.accept_any |= accept
+
+    def __len__(self) -> int:
+        return len(self.regexes)
+
+    def __repr__(self) -> str:
+        return f"RegexSet({self.regexes!r})"
+
+    def matches(self, string) -> list:
+        """
+        Finds which regexes match string.
+
+        :param string: the string to match
+        :return: sorted indices of the matching regexes, the same ones
+        is_match() would accept
+        """
+        if not string:
+            return [i for i, regex in enumerate(self.regexes) if not regex]
+
+        start, accept_any = self.start, self.accept_any
+        step = self.step
+        states = start | self.start_anchored
+        found = 0
+        alive = -1
+        for char in string:
+            states |= start
+            hits = states & accept_any
+            if hits:
+                found |= hits
+                alive &= ~self.finished(hits)
+                start &= alive
+                accept_any &= alive
+            states = step(states, char) & alive
+            if not states and not start:
+                break
+        states |= start
+        found |= states & (accept_any | self.accept_end)
+        return self.indices(found)
+
+    def finished(self, accepts) -> int:
+        """State bits of every regex whose accept bit is set in accepts."""
+        states = 0
+        for index in self.indices(accepts):
+            states |= self.ranges[index]
+        return states
+
+    def indices(self, accepts) -> list:
+        """Regex indices of the accept bits set in accepts, in order."""
+        indices = []
+        while accepts:
+            bit = accepts & -accepts
+            indices.append(self.accepts[bit])
+            accepts ^= bit
+        return indices
+
+
+class LazyDFA(Pattern):
+    """
+    A compiled regex that caches its forward NFA steps as DFA transitions.
+
+    Each NFA state set becomes a DFA state the first time it is reached, and
+    its transitions are filled in as characters are seen, so only the states
+    a string actually visits are ever built. Once more than capacity
+    transitions are cached the cache is flushed. When that happens before the
+    cache has paid off (fewer than DFA_THRASH_STEPS steps per cached
+    transition), the next capacity * DFA_THRASH_STEPS steps use plain NFA
+    simulation before the cache is tried again.
+    """
+
+    capacity: int
+    transitions: dict
+    cached: int
+    hits: int
+    misses: int
+    flushes: int
+    fallbacks: int
+    fallback_steps: int
+    steps_since_flush: int
+
+    def __init__(self, regex, capacity=DFA_CAPACITY) -> None:
+        """
+        Compiles the regex with an empty DFA cache.
+
+        :param regex: the regex to compile
+        :param capacity: most transitions kept in the cache
+        """
+        super().__init__(regex)
+        self.reset(capacity)
+
+    def __repr__(self) -> str:
+        return f"LazyDFA({self.regex!r}, capacity={self.capacity})"
+
+    @classmethod
+    def from_bytes(cls, buffer, offset=0, capacity=DFA_CAPACITY):
+        """
+        Rebuilds a LazyDFA from to_bytes() output, with an empty cache.
+
+        :param buffer: bytes or a memory-mapped file holding the packed pattern
+        :param offset: where the packed pattern starts in buffer
+        :param capacity: most transitions kept in the cache
+        """
+        dfa = super().from_bytes(buffer, offset)
+        dfa.reset(capacity)
+        return dfa
+
+    def reset(self, capacity) -> None:
+        """Empties the cache and zeroes its counters."""
+        self.capacity = capacity
+        self.transitions = {}  # state set -> {character: next state set}
+        self.cached = 0  # cached transitions
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.fallbacks = 0  # times the cache thrashed
+        self.fallback_steps = 0  # NFA steps left before the cache is used again
+        self.steps_since_flush = 0  # hits + misses at the last flush
+
+    def step(self, states, char) -> int:
+        """Advances the active states over one character, through the cache."""
+        if self.fallback_steps:
+            self.fallback_steps -= 1
+            return NFA.step(self, states, char)
+        row = self.transitions.get(states)
+        if row is None:
+            row = self.transitions[states] = {}
+        else:
+            target = row.get(char)
+            if target is not None:
+                self.hits += 1
+                return target
+        self.misses += 1
+        target = row[char] = NFA.step(self, states, char)
+        self.cached += 1
+        if self.cached > self.capacity:
+            self.flush()
+        return target
+
+    def flush(self) -> None:
+        """Empties the cache, falling back to the NFA if it filled up too fast."""
+        steps = self.hits + self.misses - self.steps_since_flush
+        if steps < self.capacity * DFA_THRASH_STEPS:
+            self.fallbacks += 1
+            self.fallback_steps = self.capacity * DFA_THRASH_STEPS
+        self.steps_since_flush = self.hits + self.misses
+        self.transitions.clear()
+        self.cached = 0
+        self.flushes += 1
+
+    def stats(self) -> dict:
+        """Cache counters, for tuning the capacity."""
+        return {
+            "capacity": self.capacity,
+            "states": len(self.transitions),
+            "transitions": self.cached,
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "fallbacks": self.fallbacks,
+        }
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile(regex, dfa=False):
+    """
+    Returns a compiled Pattern for regex, reused for repeated regexes.
+    With dfa set, the pattern is a LazyDFA that caches its NFA steps.
+    """
+    return LazyDFA(regex) if dfa else Pattern(regex)
+
+
+class Profiler:
+    """
+    Collects per-regex counters for is_match() while instrumentation is on.
+
+    For every regex it counts calls, matches, characters in the strings, NFA
+    steps (one per character stepped, forwards or backwards), the start
+    positions the unanchored loop tried and the time spent. Steps are counted
+    on a per-call copy of the cached pattern with wrapped step functions, so
+    concurrent calls never see each other's counters and is_match() pays
+    nothing but a None check while it is off.
+    """
+
+    profiles: dict
+    lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.profiles = {}  # regex -> counters
+        self.lock = threading.Lock()  # is_match() may be called from many threads
+
+    def run(self, regex, string) -> bool:
+        """Runs is_match(regex, string) and adds its counters to the regex."""
+        pattern = compile(regex)
+        steps = {"forward": 0, "reverse": 0}
+
+        def counted(nfa, direction):
+            # a shallow copy with its own step, so the cached pattern other
+            # threads are matching with is never touched
+            nfa = copy.copy(nfa)
+            step = nfa.step
+
+            def count(states, char):
+                steps[direction] += 1
+                return step(states, char)
+
+            nfa.step = count
+            return nfa
+
+        instrumented = counted(pattern, "forward")
+        instrumented.reverse = counted(pattern.reverse, "reverse")
+        started = time.perf_counter()
+        result = instrumented.match(string)
+        seconds = time.perf_counter() - started
+
+        with self.lock:
+            profile = self.profiles.setdefault(
+                regex,
+                {
+                    "calls": 0,
+                    "matches": 0,
+                    "characters": 0,
+                    "steps": 0,
+                    "positions": 0,
+                    "seconds": 0.0,
+                },
+            )
+            profile["calls"] += 1
+            profile["matches"] += result
+            profile["characters"] += len(string)
+            profile["steps"] += steps["forward"] + steps["reverse"]
+            # an anchored regex is only ever tried from one position
+            unanchored = not pattern.anchor_start and not pattern.anchor_end
+            profile["positions"] += steps["forward"] if unanchored else 1
+            profile["seconds"] += seconds
+        return result
+
+    def report(self) -> list:
+        """The counters of every regex, slowest total time first."""
+        rows = []
+        with self.lock:
+            for regex, profile in self.profiles.items():
+                rows.append(
+                    {
+                        "regex": regex,
+                        **profile,
+                        "seconds_per_call": profile["seconds"] / profile["calls"],
+                        "steps_per_call": profile["steps"] / profile["calls"],
+                    }
+                )
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+
+def enable_instrumentation():
+    """Starts collecting is_match() counters in a fresh Profiler."""
+    global profiler
+    profiler = Profiler()
+
+
+def disable_instrumentation():
+    """Stops collecting counters and returns the final report."""
+    global profiler
+    report = instrumentation_report()
+    profiler = None
+    return report
+
+
+def instrumentation_report():
+    """Per-regex counters collected so far, see Profiler.report()."""
+    return profiler.report() if profiler is not None else []
+
+
+def search(regex, string):
+    """(start, end) of the leftmost, longest match of regex in string, or None."""
+    return compile(regex).search(string)
+
+
+def finditer(regex, string):
+    """Yields the (start, end) spans of the non-overlapping matches of regex."""
+    return compile(regex).finditer(string)
+
+
+class PatternFile(Mapping):
+    """
+    Compiled patterns read back from a file written by save(), keyed by regex.
+
+    The file is memory-mapped and only its index is read up front. A pattern
+    is unpacked from the mapping the first time it is looked up, so opening a
+    file of hundreds of patterns costs little more than the page faults for
+    the patterns that get used.
+    """
+
+    path: str
+    view: mmap.mmap
+    offsets: dict
+    patterns: dict
+
+    def __init__(self, path) -> None:
+        """
+        Maps the file and reads its index.
+
+        :param path: a file written by save()
+        """
+        self.path = path
+        self.patterns = {}
+        with open(path, "rb") as file:
+            self.view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = struct.unpack_from(FILE_HEADER, self.view)
+        if magic != FILE_MAGIC:
+            self.view.close()
+            raise ValueError(f"{path} is not a compiled pattern file")
+        self.offsets = {}  # regex -> offset of its packed pattern
+        position = struct.calcsize(FILE_HEADER)
+        for _ in range(count):
+            offset, length = struct.unpack_from(INDEX_ENTRY, self.view, position)
+            position += struct.calcsize(INDEX_ENTRY)
+            if offset + length > len(self.view):
+                self.view.close()
+                raise ValueError(f"{path} ends inside a pattern")
+            regex_length = struct.unpack_from(PATTERN_HEADER, self.view, offset)[0]
+            start = offset + struct.calcsize(PATTERN_HEADER)
+            self.offsets[self.view[start : start + regex_length].decode()] = offset
+
+    def __getitem__(self, regex) -> Pattern:
+        if regex not in self.patterns:
+            self.patterns[regex] = Pattern.from_bytes(self.view, self.offsets[regex])
+        return self.patterns[regex]
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the file, patterns already looked up stay usable."""
+        self.view.close()
+
+
+def save(patterns, path) -> None:
+    """
+    Writes compiled patterns to a file for load().
+
+    The file is a header, an index of (offset, length) entries, then every
+    pattern packed by Pattern.to_bytes().
+
+    :param patterns: an iterable of Patterns or regexes
+    :param path: the file to write
+    """
+    packed = [
+        (pattern if isinstance(pattern, Pattern) else compile(pattern)).to_bytes()
+        for pattern in patterns
+    ]
+    index = []
+    offset = struct.calcsize(FILE_HEADER) + len(packed) * struct.calcsize(INDEX_ENTRY)
+    for blob in packed:
+        index.append(struct.pack(INDEX_ENTRY, offset, len(blob)))
+        offset += len(blob)
+    with open(path, "wb") as file:
+        file.write(struct.pack(FILE_HEADER, FILE_MAGIC, len(packed)))
+        file.writelines(index)
+        file.writelines(packed)
+
+
+def load(path):
+    """Opens a file written by save() as a PatternFile."""
+    return PatternFile(path)
+
+
+def match_chunk(regex, strings):
+    """Matches one chunk of strings, runs inside a match_many worker process."""
+    pattern = compile(regex)
+    return [pattern.match(string) for string in strings]
+
+
+def match_many(regex, strings, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields is_match(regex, string) for every string, in input order.
+
+    The regex is compiled once. With more than one worker, chunks of strings
+    are matched in a process pool. Only two chunks per worker are in flight
+    at a time, so strings can come from an iterable of any length.
+
+    :param regex: the regex to match
+    :param strings: an iterable of strings
+    :param workers: number of worker processes, None or 1 matches in this process
+    :param chunk_size: number of strings sent to a worker at once
+    """
+    if not workers or workers < 2:
+        pattern = compile(regex)
+        for string in strings:
+            yield pattern.match(string)
+        return
+
+    strings = iter(strings)
+    chunks = iter(lambda: list(itertools.islice(strings, chunk_size)), [])
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(match_chunk, regex, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_lines(view, begin, end):
+    """Yields the lines of a memory-mapped file between byte offsets begin and end."""
+    view.seek(begin)
+    while view.tell() < end:
+        yield view.readline()
+
+
+def match_line(pattern, line, required, encoding):
+    """
+    Decodes and matches one line of bytes.
+
+    :param pattern: the compiled Pattern
+    :param line: the line as bytes
+    :param required: bytes every matching line contains, checked before decoding
+    :param encoding: text encoding of the line
+    :return: the decoded line without its line ending, or None if it doesn't match
+    """
+    if required not in line:
+        return None
+    text = line.decode(encoding, errors="replace").rstrip("\r\n")
+    return text if pattern.match(text) else None
+
+
+def required_bytes(pattern, encoding):
+    """
+    A utf-8 line holds the bytes of the required literal exactly when its text
+    holds the literal, so lines without them can be skipped before decoding.
+    """
+    return pattern.literal.encode() if encoding == "utf-8" else b""
+
+
+def grep(regex, path, encoding="utf-8"):
+    """
+    Yields (line number, line) for every line of a file that matches regex.
+
+    The file is memory-mapped and read one line at a time, so only the current
+    line is ever decoded and memory stays bounded for files of any size.
+
+    :param regex: the regex to match
+    :param path: path of the file to scan
+    :param encoding: text encoding of the file
+    """
+    pattern = compile(regex)
+    required = required_bytes(pattern, encoding)
+    if not os.path.getsize(path):
+        return
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for number, line in enumerate(read_lines(view, 0, len(view)), 1):
+                text = match_line(pattern, line, required, encoding)
+                if text is not None:
+                    yield number, text
+
+
+def line_bounds(view, parts):
+    """
+    Splits a memory-mapped file into at most parts byte ranges. Every range
+    starts at the beginning of a line.
+
+    :return: the offsets between ranges, from 0 to the file size
+    """
+    size = len(view)
+    bounds = [0]
+    for part in range(1, parts):
+        cut = view.find(b"\n", max(bounds[-1], size * part // parts)) + 1
+        if not cut:
+            break
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return bounds
+
+
+def grep_chunk(regex, path, begin, end, encoding="utf-8"):
+    """
+    Greps the lines between byte offsets begin and end of a file, runs inside
+    a grep_parallel worker.
+
+    :return: the number of lines in the chunk and its (line number, line)
+    matches, numbered from 1 within the chunk
+    """
+    pattern = compile(regex)
+    required = required_bytes(pattern, encoding)
+    matches = []
+    number = 0
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for number, line in enumerate(read_lines(view, begin, end), 1):
+                text = match_line(pattern, line, required, encoding)
+                if text is not None:
+                    matches.append((number, text))
+    return number, matches
+
+
+def grep_parallel(regex, path, workers=None, encoding="utf-8"):
+    """
+    Same results as grep(), with the file split into chunks on line boundaries
+    and the chunks scanned in a process pool. Every worker memory-maps the file
+    itself, so the chunks are read straight from the shared page cache and only
+    the matching lines are sent back. Chunks are merged in file order.
+
+    :param regex: the regex to match
+    :param path: path of the file to scan
+    :param workers: number of worker processes, defaults to the CPU count
+    :param encoding: text encoding of the file
+    """
+    workers = workers or os.cpu_count() or 1
+    if not os.path.getsize(path):
+        return
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            bounds = line_bounds(view, workers * CHUNKS_PER_WORKER)
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(grep_chunk, regex, path, begin, end, encoding)
+            for begin, end in zip(bounds, bounds[1:])
+        ]
+        offset = 0
+        for future in futures:
+            lines, matches = future.result()
+            for number, text in matches:
+                yield offset + number, text
+            offset += lines
 
 
 def main():
-    """Takes input from console regex|string and print T/F if match"""
-    compare = input().split("|")
-    regex = compare[0]
-    string = compare[1]
-    print(is_match(regex, string))
+    """
+    Takes input from console regex|string and print T/F if match.
+    Given a regex and a file path, prints the matching lines of the file.
+    """
+    parser = argparse.ArgumentParser(
+        description="Match a regex against a string or the lines of a file."
+    )
+    parser.add_argument("regex", nargs="?", help="regex to match")
+    parser.add_argument("path", nargs="?", help="file to scan line by line")
+    parser.add_argument(
+        "-n", "--line-number", action="store_true", help="print line numbers"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="scan the file in this many worker processes"
+    )
+    parser.add_argument(
+        "-c", "--count", action="store_true", help="only print the number of matches"
+    )
+    args = parser.parse_args()
+
+    if args.regex is None:
+        compare = input().split("|")
+        regex = compare[0]
+        string = compare[1]
+        print(is_match(regex, string))
+        return
+    if args.path is None:
+        parser.error("a file path is needed to scan a file")
+
+    count = 0
+    if args.jobs:
+        matches = grep_parallel(args.regex, args.path, args.jobs)
+    else:
+        matches = grep(args.regex, args.path)
+    for number, line in matches:
+        count += 1
+        if args.count:
+            continue
+        print(f"{number}:{line}" if args.line_number else line)
+    if args.count:
+        print(count)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,26 @@
-from regex-engine import is_match
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from regex import (
+    LazyDFA,
+    Pattern,
+    RegexSet,
+    compare_strings,
+    compile,
+    disable_instrumentation,
+    enable_instrumentation,
+    finditer,
+    grep,
+    grep_parallel,
+    instrumentation_report,
+    is_match,
+    load,
+    match_many,
+    match_stream,
+    save,
+    search,
+)
 import pytest
 
 
@@ -297,3 +319,247 @@ import pytest
 def test_cases(regex, string, expected, _):
     values = {"True": True, "False": False}
     assert is_match(regex, string) is values[expected]
+
+
+@pytest.mark.parametrize(
+    "regex, string, expected",
+    [
+        ("apple", "app", False),
+        ("a*b", "aaa", False),
+        (".*c", "abcd", True),
+        (".*c$", "abcd", False),
+        ("^a$", "aba", False),
+        ("^a.*a$", "aba", True),
+        ("a**", "a*", True),
+        ("\\.+", "a", False),
+        ("a\\", "a\\", True),
+    ],
+)
+def test_backtracking_cases(regex, string, expected):
+    assert is_match(regex, string) is expected
+
+
+def test_compile_is_cached():
+    pattern = compile("colou?r")
+    assert compile("colou?r") is pattern
+    assert pattern.match("colour") and not pattern.match("colouur")
+
+
+def test_compare_strings_cursors():
+    assert compare_strings("b.*d", "abcd", 0, 1)
+    assert not compare_strings("b.*d", "abcd", 0, 0)
+    assert compare_strings("a" + "x.*z", "ax" + "y" * 10_000 + "z")
+
+
+@pytest.mark.parametrize(
+    "regex, string",
+    [
+        ("^a.*z$", "a" + "b" * 100_000 + "z"),
+        ("x?" * 2_000 + "y", "y"),
+        ("a" * 5_000, "a" * 5_000),
+    ],
+)
+def test_long_inputs_do_not_recurse(regex, string):
+    assert is_match(regex, string)
+    assert compare_strings(regex.strip("^$"), string)
+
+
+def test_pathological_backtracking_is_memoized():
+    regex = "a?" * 30 + "a" * 30
+    assert compare_strings(regex, "a" * 30)
+    assert not compare_strings(regex + "b", "a" * 60)
+    assert not compare_strings(".*" * 10 + "x", "a" * 200)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_match_many_keeps_input_order(workers):
+    strings = (f"line {i} {'error' if i % 3 == 0 else 'ok'}" for i in range(50))
+    results = list(match_many("err.r$", strings, workers=workers, chunk_size=7))
+    assert results == [i % 3 == 0 for i in range(50)]
+
+
+def test_regex_set_matches_like_is_match():
+    regexes = ["^app", "le$", "colou?r", "no+pe$", "", "x.*y", "\\.$"]
+    regex_set = RegexSet(regexes)
+    for string in ["apple", "colour", "noooope", "end.", "", "xyz"]:
+        expected = [i for i, regex in enumerate(regexes) if is_match(regex, string)]
+        assert regex_set.matches(string) == expected
+
+
+@pytest.mark.parametrize(
+    "regex, literal, lead",
+    [
+        ("error.*timeout", "error", 0),
+        ("a?b?cd.*efgh", "cd", 2),
+        (".*foo", "foo", None),
+        ("a*.?", "", None),
+    ],
+)
+def test_required_literal(regex, literal, lead):
+    pattern = compile(regex)
+    assert (pattern.literal, pattern.lead) == (literal, lead)
+    assert pattern.match("x" * 1_000 + "ab" + literal + "efgh" + "timeout" * 2)
+
+
+@pytest.mark.parametrize(
+    "regex, expected",
+    [("le$", True), ("p+le$", True), ("x.*le$", True), ("a.?e$", False), ("y*$", True)],
+)
+def test_end_anchor_on_long_string(regex, expected):
+    assert compile(regex).match("x" * 100_000 + "apple") is expected
+
+
+@pytest.mark.parametrize(
+    "regex, string, span, spans",
+    [
+        ("colou?r", "a color, a colour", (2, 7), [(2, 7), (11, 17)]),
+        ("o+", "foo boo", (1, 3), [(1, 3), (5, 7)]),
+        ("^f.*o", "foo boo", (0, 7), [(0, 7)]),
+        ("bo*$", "foo boo", (4, 7), [(4, 7)]),
+        ("x*", "ab", (0, 0), [(0, 0), (1, 1), (2, 2)]),
+        ("z", "ab", None, []),
+    ],
+)
+def test_search_and_finditer(regex, string, span, spans):
+    assert search(regex, string) == span
+    assert list(finditer(regex, string)) == spans
+
+
+def test_grep_reads_matching_lines(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"start\nerror: disk\r\nok\nerr0r again\n")
+    assert list(grep("err.r", path)) == [(2, "error: disk"), (4, "err0r again")]
+    (tmp_path / "empty.log").write_bytes(b"")
+    assert list(grep("a", tmp_path / "empty.log")) == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_grep_parallel_matches_grep(tmp_path, workers):
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"{i} {'error' if i % 7 == 0 else 'ok'}\n" for i in range(500)))
+    assert list(grep_parallel("err.r$", path, workers)) == list(grep("err.r$", path))
+
+
+def test_lazy_dfa_counts_and_falls_back():
+    string = "axyz" * 50 + "ab"
+    dfa = compile("a.?.?b", dfa=True)
+    assert dfa.search(string) == compile("a.?.?b").search(string)
+    assert dfa.stats()["hits"] > dfa.stats()["misses"] > 0
+
+    small = LazyDFA("a.?.?.?b", capacity=2)
+    assert small.match(string)
+    assert small.stats()["flushes"] >= 1 and small.stats()["fallbacks"] >= 1
+
+
+def test_save_and_load_compiled_patterns(tmp_path):
+    regexes = ["^app", "le$", "colou?r", "x.*y", "\\.$", "", "hé+llo"]
+    path = tmp_path / "patterns.rxe"
+    save(regexes, path)
+    with load(path) as patterns:
+        assert list(patterns) == regexes
+        for regex in regexes:
+            for string in ["apple", "colour", "xzy", "end.", "hééllo", ""]:
+                assert patterns[regex].match(string) is is_match(regex, string)
+                assert patterns[regex].search(string) == search(regex, string)
+
+
+def test_save_and_load_lazy_dfa(tmp_path):
+    fresh, used = LazyDFA("^abc"), LazyDFA("^abc")
+    assert used.match("abc")
+    path = tmp_path / "dfa.rxe"
+    save([fresh, compile("a.?c", dfa=True)], path)
+    with load(path) as patterns:
+        for string in ["abc", "ab", "abcd", "ac", "xabcx"]:
+            assert patterns["^abc"].match(string) is is_match("^abc", string)
+            assert patterns["a.?c"].match(string) is is_match("a.?c", string)
+    save([used], path)
+    with load(path) as patterns:
+        assert not patterns["^abc"].match("ab")
+        assert patterns["^abc"].match("abc")
+
+
+def test_from_bytes_builds_the_class_it_is_called_on():
+    used = LazyDFA("a.?c")
+    assert used.match("abc")
+    packed = used.to_bytes()
+    assert type(Pattern.from_bytes(packed)) is Pattern
+    dfa = LazyDFA.from_bytes(b"xx" + packed, 2, capacity=5)
+    assert type(dfa) is LazyDFA
+    assert dfa.stats()["capacity"] == 5 and dfa.stats()["transitions"] == 0
+    for string in ["abc", "ac", "abbc", "xabcx"]:
+        assert dfa.match(string) is is_match("a.?c", string)
+    assert dfa.stats()["misses"] > 0
+
+
+def test_load_rejects_truncated_files(tmp_path):
+    path = tmp_path / "patterns.rxe"
+    save(["colou?r", "x.*y"], path)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="ends inside a pattern"):
+        load(path)
+
+
+@pytest.mark.parametrize(
+    "regex, chunks, expected",
+    [
+        ("^no+pe$", ["no", "ooo", "", "pe"], True),
+        ("^no+pe$", ["no", "ooo", "pe", "!"], False),
+        ("err.r", ["xx er", "ror", "yy"], True),
+        ("a*", [], False),
+        ("", [], True),
+    ],
+)
+def test_matcher_feeds_chunks(regex, chunks, expected):
+    matcher = compile(regex).matcher()
+    for chunk in chunks:
+        matcher.feed(chunk)
+    assert matcher.finish() is expected is is_match(regex, "".join(chunks))
+
+
+def test_match_stream_reads_asyncio_reader():
+    async def run(regex, data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await match_stream(regex, reader, chunk_size=3)
+
+    assert asyncio.run(run("wörld$", "hello wörld".encode()))
+    assert not asyncio.run(run("^x", b"hello"))
+
+
+def test_instrumentation_report():
+    enable_instrumentation()
+    try:
+        assert is_match("err.r", "x" * 100 + "error")
+        assert not is_match("err.r", "ok")
+        assert is_match("le$", "apple")
+    finally:
+        report = disable_instrumentation()
+    rows = {row["regex"]: row for row in report}
+    assert rows["err.r"]["calls"] == 2 and rows["err.r"]["matches"] == 1
+    assert rows["err.r"]["characters"] == 107
+    # the literal prefilter skips the leading x's and rejects "ok" outright
+    assert rows["err.r"]["positions"] == 5
+    assert rows["le$"]["positions"] == 1 and rows["le$"]["steps"] == 2
+    assert instrumentation_report() == []
+    assert "step" not in vars(compile("err.r"))
+
+
+def test_instrumentation_from_many_threads():
+    strings = ["a" * 500 + "b", "axb", "ab", "xx"] * 50
+    # switch threads often, so calls overlap inside pattern.match()
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    enable_instrumentation()
+    try:
+        single = [is_match("a.?b", string) for string in strings]
+        steps = instrumentation_report()[0]["steps"]
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: [is_match("a.?b", s) for s in strings], range(4)))
+    finally:
+        report = disable_instrumentation()
+        sys.setswitchinterval(interval)
+    assert results == [single] * 4
+    assert report[0]["calls"] == 5 * len(strings)
+    assert report[0]["steps"] == 5 * steps
+    assert "step" not in vars(compile("a.?b"))